@@ -3,21 +3,33 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression, LogisticRegression
-from sklearn.neighbors import KNeighborsRegressor, KNeighborsClassifier
-from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import StandardScaler
 import io
-import yfinance as yf
 import datetime
 import time
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_message
-import base64
-import os
 from pathlib import Path
 import random 
+from stock_ml.data_store import OHLCVStore, download_yfinance_bars
+from stock_ml.quotes import QuoteService, QUOTE_TTL_SECONDS
+from stock_ml.universe import load_universe, parse_watchlist
+from stock_ml.cleaning import clean_numeric_columns
+from stock_ml.memory import compact_frame, pipeline_memory_report
+from stock_ml.lineage import FrameLineage
+from stock_ml.stages import StageCache, fingerprint
+from stock_ml.theme_assets import prepare_backgrounds, background_data_uri
+from stock_ml.ingest import read_csv_chunked, MemoryLimitExceeded, DEFAULT_CHUNK_ROWS, DEFAULT_MEMORY_LIMIT_MB
+from stock_ml.indicators import INDICATORS, DEFAULT_WINDOWS, compute_indicators, parse_windows
+from stock_ml.incremental import IndicatorStore
+from stock_ml.lags import LagFeatures
+from stock_ml.correlation import CorrelationEngine, HEATMAP_TEXT_LIMIT, cluster_order, top_correlations, heatmap_matrix
+from stock_ml.validation import WALK_FORWARD_MODES, walk_forward_folds, walk_forward_cv
+from stock_ml.knn_sweep import KNN_SWEEP_MAX_K, validation_split, knn_sweep
+from stock_ml.knn_index import KNN_INDEX_BACKENDS, TREE_BACKENDS, DEFAULT_LEAF_SIZE, DEFAULT_N_PROBE, benchmark_backends, best_leaf_sizes
+from stock_ml.artifacts import ModelArtifactStore
+from stock_ml.downsample import POINT_BUDGET, DOWNSAMPLE_METHODS, downsample_series, scatter_trace
+from stock_ml.metrics import BOOTSTRAP_RESAMPLES, BOOTSTRAP_CONFIDENCE, metrics_table, bootstrap_intervals
+from stock_ml.predictor import CompiledPredictor, feature_bounds, sample_rows, feature_grid, grid_predictions
+from stock_ml.engine import MODEL_TYPES, is_continuous, impute_missing, moving_average, scale_features, split_rows, build_model, applicable_models, fit_models, predict_models, stored_indicators
 
 st.set_page_config(page_title="Stock ML Pipeline", layout="wide", page_icon="📈")
 
@@ -33,23 +45,45 @@ def init_session_state():
             'model_trained': False,
             'model_evaluated': False,
             'results_visualized': False,
-            'df': None,
-            'df_processed': None,
+            'frames': None,
+            'stage_keys': {},
             'target': None,
             'features': None,
-            'X_train': None,
-            'X_test': None,
-            'y_train': None,
-            'y_test': None,
             'models': {},
             'y_preds': {},
             'current_price': None,
             'last_symbol': None,
+            'from_store': False,
+            'fetch_report': None,
+            'cleaning_report': None,
+            'cv_folds': None,
+            'fit_seconds': {},
+            'scaler': None,
         }
     
     # Initialize theme state if not present
     if 'theme' not in st.session_state:
         st.session_state.theme = 'default'
+    
+    # Memoized stage outputs, kept across pipeline restarts
+    if 'stage_cache' not in st.session_state:
+        st.session_state.stage_cache = StageCache()
+    
+    # Built Plotly figures, reused until their inputs change
+    if 'figure_cache' not in st.session_state:
+        st.session_state.figure_cache = StageCache()
+    
+    # Opt-in compact dtypes for loaded data
+    if 'compact_dtypes' not in st.session_state:
+        st.session_state.compact_dtypes = False
+    
+    # Number of neighbors for KNN (the k sweep can set it too)
+    if 'n_neighbors' not in st.session_state:
+        st.session_state.n_neighbors = 5
+    
+    # KD-tree / ball tree leaf size for KNN (the index benchmark can set it too)
+    if 'knn_leaf_size' not in st.session_state:
+        st.session_state.knn_leaf_size = DEFAULT_LEAF_SIZE
 
 init_session_state()
 
@@ -65,6 +99,23 @@ def get_image_path(image_name):
         return None
     return image_path
 
+# Backgrounds are downsized once per process into the static folder Streamlit serves
+STATIC_BACKGROUNDS_DIR = Path(__file__).parent / "static" / "backgrounds"
+
+@st.cache_resource
+def get_theme_backgrounds():
+    return prepare_backgrounds(ASSETS_DIR, STATIC_BACKGROUNDS_DIR)
+
+# Function to get a cacheable URL for a theme background
+def get_background_url(image_name):
+    if get_image_path(image_name) is None:
+        return ""
+    background = get_theme_backgrounds()[image_name]
+    if st.get_option("server.enableStaticServing"):
+        # Content-hashed file name, so the browser can cache it across reruns
+        return f"app/static/backgrounds/{background.name}"
+    return background_data_uri(background)
+
 def theme_selector():
     themes = {
         'default': 'Default Dark',
@@ -92,7 +143,7 @@ def apply_theme_css():
     <style>
     .stApp {{
         background:  
-                    url("data:image/jpg;base64,{get_base64_encoded_image(get_image_path('image (2).jpg'))}") no-repeat center center fixed;
+                    url("{get_background_url('image (2).jpg')}") no-repeat center center fixed;
         background-size: cover;
     }}
     
@@ -172,7 +223,7 @@ def apply_theme_css():
     <style>
     .stApp {{
         background: 
-            url("data:image/jpg;base64,{get_base64_encoded_image(get_image_path('cyber.png'))}") no-repeat center center fixed;
+            url("{get_background_url('cyber.png')}") no-repeat center center fixed;
         background-size: cover;
     }}
 
@@ -266,7 +317,7 @@ def apply_theme_css():
     <style>
     .stApp {{
         background: 
-                    url("data:image/jpg;base64,{get_base64_encoded_image(get_image_path('blues.jpg'))}") no-repeat center center fixed;
+                    url("{get_background_url('blues.jpg')}") no-repeat center center fixed;
         background-size: cover;
     }}
     
@@ -350,7 +401,7 @@ def apply_theme_css():
     <style>
     .stApp {{
         background: 
-                    url("data:image/jpg;base64,{get_base64_encoded_image(get_image_path('orange.png'))}") no-repeat center center fixed;
+                    url("{get_background_url('orange.png')}") no-repeat center center fixed;
         background-size: cover;
     }}
     
@@ -432,13 +483,6 @@ def apply_theme_css():
     """
     }
     
-    # Define get_base64_encoded_image helper function
-    def get_base64_encoded_image(image_path):
-        if image_path is None or not os.path.isfile(image_path):
-            return None
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    
     # Define base CSS
     base_css = """
     <style>
@@ -480,60 +524,82 @@ def apply_theme_css():
         css_with_image = theme_css[current_theme]()
         st.markdown(css_with_image, unsafe_allow_html=True)
 
-# Helper function to clean numeric columns
-def clean_numeric_columns(df):
-    for col in df.columns:
-        if df[col].dtype == 'object':
-            try:
-                df[col] = df[col].astype(str).str.replace(r'[^\d.-]', '', regex=True)
-
-                df[col] = pd.to_numeric(df[col], errors='ignore')
-            except Exception as e:
-                st.warning(f"Could not convert column {col} to numeric: {str(e)}")
+# Helper function to shrink a freshly loaded frame when compact mode is on
+def compact_if_enabled(df):
+    if st.session_state.compact_dtypes:
+        return compact_frame(df)
     return df
 
-# Helper function to check if a series is continuous or categorical
-def is_continuous(series):
-    if pd.api.types.is_numeric_dtype(series):
-        unique_values = len(series.unique())
-        return unique_values > 10
-    return False
+# Helper function to materialize the train or test matrices from the frame lineage on demand
+def get_split(rows):
+    frames = st.session_state.pipeline['frames']
+    features = st.session_state.pipeline['features']
+    target = st.session_state.pipeline['target']
+    X = frames.frame('df_features', columns=features, rows=rows)
+    y = frames.series('df_features', target, rows=rows)
+    return X, y
+
+# Persistent OHLCV store consulted before hitting Yahoo Finance (shared by all sessions)
+@st.cache_resource
+def get_ohlcv_store():
+    return OHLCVStore()
+
+# Indicator values and state kept next to the OHLCV store, updated only for appended bars
+@st.cache_resource
+def get_indicator_store():
+    return IndicatorStore(get_ohlcv_store().root)
+
+# Fitted models saved to disk, so identical configurations are loaded instead of refitted
+@st.cache_resource
+def get_artifact_store():
+    return ModelArtifactStore()
+
+# Plotly figures are reused across reruns until their data, the theme or their parameters
+# change. `data` is fingerprinted, so pass stage keys or small frames rather than whole
+# histories. The built Figure itself is kept: st.plotly_chart re-validates serialized figures
+# by rebuilding them, which would cost as much as building them again.
+def cached_figure(name, data, params, build):
+    _, fig = st.session_state.figure_cache.run(name, [fingerprint(*data), st.session_state.theme], params, build)
+    return fig
+
+# Zoom window of a downsampled chart: its latest box selection, redrawn at full detail. Each
+# selection is applied once, so "Reset zoom" sticks while the chart still holds the selection.
+def chart_zoom_window(chart_key):
+    zoom_key = f'{chart_key}_zoom'
+    event = st.session_state.get(chart_key)
+    boxes = event['selection']['box'] if event else []
+    if boxes and boxes[-1].get('x'):
+        box = boxes[-1]['x']
+        if repr(box) != st.session_state.get(f'{zoom_key}_applied'):
+            st.session_state[zoom_key] = (min(box), max(box))
+            st.session_state[f'{zoom_key}_applied'] = repr(box)
+    return st.session_state.get(zoom_key)
 
 # Helper function to fetch data from yfinance with retry logic and caching
 @st.cache_data
 def fetch_yfinance_data(symbol, start_date, end_date, _cache_key=None):
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_message(match='Too Many Requests')
-    )
-    def fetch():
-        try:
-            stock = yf.Ticker(symbol)
-            df = stock.history(start=start_date, end=end_date)
-            
-            if df.empty:
-                st.error(f"No data found for symbol {symbol} in the specified date range. Suggested symbols: AAPL, TSLA, MSFT.")
-                return None
-            
-            df = df.reset_index()
-            df = df[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
-            return df
-        except Exception as e:
-            st.error(f"Error fetching data from yfinance: {str(e)}. Suggested symbols: AAPL, TSLA, MSFT.")
+    try:
+        # Only the date ranges missing from the local store are downloaded
+        df = get_ohlcv_store().load(symbol, start_date, end_date, download_yfinance_bars)
+        
+        if df.empty:
+            st.error(f"No data found for symbol {symbol} in the specified date range. Suggested symbols: AAPL, TSLA, MSFT.")
             return None
-    
-    return fetch()
+        
+        return df
+    except Exception as e:
+        st.error(f"Error fetching data from yfinance: {str(e)}. Suggested symbols: AAPL, TSLA, MSFT.")
+        return None
+
+# Process-wide quote cache shared by every session
+@st.cache_resource
+def get_quote_service():
+    return QuoteService(ttl=QUOTE_TTL_SECONDS)
 
 # Helper function to fetch current price
 def fetch_current_price(symbol):
     try:
-        stock = yf.Ticker(symbol)
-        current_data = stock.info
-        current_price = current_data.get('regularMarketPrice', current_data.get('currentPrice'))
-        if current_price is None:
-            return None
-        return current_price
+        return get_quote_service().get_quote(symbol)
     except Exception as e:
         st.warning(f"Could not fetch current price for {symbol}: {str(e)}")
         return None
@@ -793,11 +859,7 @@ def welcome_step():
         # Interactive Features: Animated Stock Ticker
         try:
             with st.spinner("Fetching real-time stock data..."):
-                stock_data = {}
-                for symbol in ["AAPL", "TSLA", "MSFT", "GOOGL", "AMZN"]:
-                    stock = yf.Ticker(symbol)
-                    current_price = stock.info.get("regularMarketPrice", stock.info.get("currentPrice", "N/A"))
-                    stock_data[symbol] = current_price
+                stock_data = get_quote_service().get_quotes(["AAPL", "TSLA", "MSFT", "GOOGL", "AMZN"])
                 ticker_text = " | ".join([f"{symbol}: ${price:.2f}" if isinstance(price, (int, float)) else f"{symbol}: N/A" for symbol, price in stock_data.items()])
                 st.markdown(f"""
                     <div class="stock-ticker">
@@ -860,23 +922,53 @@ def welcome_step():
 def load_data_step():
     st.header("Step 1: Load Data 📊")
     
-    data_option = st.radio("Select data source:", ("Upload your own data", "Fetch data from yfinance"))
+    data_option = st.radio("Select data source:", ("Upload your own data", "Fetch data from yfinance", "Fetch a watchlist from yfinance"))
     
     if data_option == "Upload your own data":
+        stream_csv = st.checkbox("Stream large CSV files in chunks", value=False,
+                                 help="Reads the CSV chunk by chunk, cleaning and downcasting each one, and stops at a memory limit.")
+        if stream_csv:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                chunk_rows = st.number_input("Rows per chunk", min_value=10_000, max_value=5_000_000, value=DEFAULT_CHUNK_ROWS, step=50_000)
+            with col2:
+                memory_limit_mb = st.number_input("Memory limit (MB)", min_value=64, max_value=65_536, value=int(DEFAULT_MEMORY_LIMIT_MB), step=256)
+            with col3:
+                csv_engine = st.selectbox("CSV engine", ["pandas", "pyarrow"])
+        
         uploaded_file = st.file_uploader("Upload your stock data (CSV or Excel)", type=["csv", "xlsx"])
         
-        if uploaded_file is not None:
+        streaming = stream_csv and uploaded_file is not None and uploaded_file.name.endswith('.csv')
+        if streaming:
+            header = pd.read_csv(uploaded_file, nrows=0).columns.tolist()
+            uploaded_file.seek(0)
+            usecols = st.multiselect("Columns to load", header, default=header)
+        
+        if uploaded_file is not None and (not streaming or st.button("Load Data")):
             try:
-                if uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
+                if streaming:
+                    with st.spinner("Streaming CSV in chunks..."):
+                        df, cleaning_report = read_csv_chunked(
+                            uploaded_file,
+                            usecols=usecols or None,
+                            chunk_rows=chunk_rows,
+                            engine=csv_engine,
+                            memory_limit_mb=memory_limit_mb
+                        )
                 else:
-                    df = pd.read_excel(uploaded_file)
-                
-                df = clean_numeric_columns(df)
+                    if uploaded_file.name.endswith('.csv'):
+                        df = pd.read_csv(uploaded_file)
+                    else:
+                        df = pd.read_excel(uploaded_file)
+                    
+                    df, cleaning_report = clean_numeric_columns(df)
                 
-                st.session_state.pipeline['df'] = df
+                df = compact_if_enabled(df)
+                st.session_state.pipeline['frames'] = FrameLineage(df)
+                st.session_state.pipeline['cleaning_report'] = cleaning_report
                 st.session_state.pipeline['data_loaded'] = True
                 st.session_state.pipeline['last_symbol'] = None
+                st.session_state.pipeline['from_store'] = False
                 
                 st.success("✅ Data loaded successfully!")
                 
@@ -893,12 +985,14 @@ def load_data_step():
                 st.session_state.pipeline['current_step'] = 2
                 st.rerun()
             
+            except MemoryLimitExceeded as e:
+                st.error(f"❌ {str(e)}")
             except Exception as e:
                 st.error(f"❌ Error loading file: {str(e)}")
-        else:
+        elif uploaded_file is None:
             st.info("ℹ️ Please upload a file to get started.")
     
-    else:
+    elif data_option == "Fetch data from yfinance":
         st.subheader("Fetch Data from yfinance")
         st.markdown("Enter the stock symbol and date range to fetch data from yfinance.")
         
@@ -918,9 +1012,12 @@ def load_data_step():
                         st.success(f"Current Price of {symbol.upper()}: ${current_price:.2f}")
                         st.session_state.pipeline['current_price'] = current_price
                     
-                    st.session_state.pipeline['df'] = df
+                    df = compact_if_enabled(df)
+                    st.session_state.pipeline['frames'] = FrameLineage(df)
                     st.session_state.pipeline['data_loaded'] = True
                     st.session_state.pipeline['last_symbol'] = symbol.upper()
+                    st.session_state.pipeline['from_store'] = True
+                    st.session_state.pipeline['cleaning_report'] = None
                     
                     st.success("✅ Data fetched successfully from yfinance!")
                     
@@ -938,6 +1035,66 @@ def load_data_step():
                     st.rerun()
             else:
                 st.warning("Please provide a stock symbol and date range.")
+    
+    else:
+        st.subheader("Fetch a Watchlist from yfinance")
+        st.markdown("Enter the stock symbols (separated by commas, spaces or new lines) and date range to fetch a multi-symbol panel.")
+        
+        watchlist = st.text_area("Watchlist", value="AAPL, MSFT, TSLA, GOOGL, AMZN")
+        start_date = st.date_input("Start Date", value=datetime.date(2024, 1, 1), key="universe_start")
+        end_date = st.date_input("End Date", value=datetime.date(2024, 12, 31), key="universe_end")
+        max_workers = st.slider("Parallel downloads", 1, 32, 8)
+        
+        if st.button("Fetch Watchlist"):
+            symbols = parse_watchlist(watchlist)
+            if symbols and start_date and end_date:
+                with st.spinner(f"Fetching {len(symbols)} symbols from yfinance..."):
+                    store = get_ohlcv_store()
+                    panel, report = load_universe(
+                        symbols,
+                        start_date.strftime('%Y-%m-%d'),
+                        end_date.strftime('%Y-%m-%d'),
+                        lambda symbol, start, end: store.load(symbol, start, end, download_yfinance_bars),
+                        max_workers=max_workers
+                    )
+                
+                st.session_state.pipeline['fetch_report'] = report
+                
+                if panel is not None:
+                    # Downstream steps work on a long frame with Symbol and Date columns
+                    df = panel.reset_index()
+                    
+                    df = compact_if_enabled(df)
+                    st.session_state.pipeline['frames'] = FrameLineage(df)
+                    st.session_state.pipeline['data_loaded'] = True
+                    st.session_state.pipeline['last_symbol'] = None
+                    st.session_state.pipeline['from_store'] = True
+                    st.session_state.pipeline['current_price'] = None
+                    st.session_state.pipeline['cleaning_report'] = None
+                    
+                    st.success(f"✅ Fetched {df['Symbol'].nunique()} symbols ({len(df)} rows) from yfinance!")
+                    
+                    # Stay on this step when some symbols failed so the report can be reviewed
+                    if report['Error'].isna().all():
+                        st.session_state.pipeline['current_step'] = 2
+                        st.rerun()
+                else:
+                    st.error("No data could be fetched for any symbol in the watchlist.")
+            else:
+                st.warning("Please provide at least one stock symbol and a date range.")
+        
+        report = st.session_state.pipeline['fetch_report']
+        if report is not None:
+            failed = report[report['Error'].notna()]
+            if not failed.empty:
+                st.warning(f"{len(failed)} of {len(report)} symbols could not be fetched: {', '.join(failed['Symbol'])}")
+            
+            with st.expander("Fetch Report"):
+                st.dataframe(report.style.format({'Seconds': '{:.3f}'}))
+            
+            if st.session_state.pipeline['data_loaded'] and st.button("Continue to Preprocessing"):
+                st.session_state.pipeline['current_step'] = 2
+                st.rerun()
 
 # Step 2: Preprocessing
 def preprocessing_step():
@@ -947,23 +1104,35 @@ def preprocessing_step():
         st.warning("Please load data first!")
         return
     
-    df = st.session_state.pipeline['df'].copy()
+    frames = st.session_state.pipeline['frames']
+    df = frames.base
+    
+    cleaning_report = st.session_state.pipeline['cleaning_report']
+    if cleaning_report is not None and not cleaning_report.empty:
+        st.subheader("Numeric Cleaning")
+        converted = cleaning_report[cleaning_report['Action'] == 'converted']
+        st.success(f"Converted {len(converted)} text column(s) to numbers")
+        with st.expander("View Cleaning Report"):
+            st.dataframe(cleaning_report)
+    
+    # Only the imputed columns are stored; the rest are shared with the loaded frame
+    preprocess_key, (missing_values, imputed) = st.session_state.stage_cache.run(
+        'preprocess', [frames.fingerprint], None, lambda: impute_missing(df)
+    )
     
     st.subheader("Missing Values")
-    missing_values = df.isnull().sum()
     if missing_values.sum() > 0:
         st.dataframe(missing_values[missing_values > 0].to_frame(name="Missing Count"))
-        numeric_cols = df.select_dtypes(include=np.number).columns
-        df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].mean())
         st.success("Missing values imputed with mean values")
     else:
         st.success("No missing values found")
     
-    st.session_state.pipeline['df_processed'] = df
+    frames.set_stage('df_processed', 'df', imputed)
+    st.session_state.pipeline['stage_keys']['preprocess'] = preprocess_key
     st.session_state.pipeline['preprocessed'] = True
     
     with st.expander("View Processed Data"):
-        st.dataframe(df)
+        st.dataframe(frames.frame('df_processed'))
     
     if st.button("Continue to Feature Engineering"):
         st.session_state.pipeline['current_step'] = 3
@@ -977,20 +1146,99 @@ def feature_engineering_step():
         st.warning("Please complete preprocessing first!")
         return
     
-    if st.session_state.pipeline['df_processed'] is None:
+    frames = st.session_state.pipeline['frames']
+    if frames is None or 'df_processed' not in frames:
         st.error("No processed data found!")
         return
     
-    df = st.session_state.pipeline['df_processed'].copy()
+    cache = st.session_state.stage_cache
+    preprocess_key = st.session_state.pipeline['stage_keys'].get('preprocess')
+    
+    # Only new and rescaled columns are stored for this stage
+    columns = frames.columns('df_processed')
+    engineered = pd.DataFrame(index=frames.index)
+    
+    def feature_column(col):
+        if col in engineered.columns:
+            return engineered[col]
+        return frames.column('df_processed', col)
     
     st.subheader("Advanced Feature Engineering")
-    if 'Close' in df.columns:
+    moving_average_key = None
+    if 'Close' in columns:
         window = st.slider("Select Moving Average window (days)", 5, 50, 20)
-        df[f'MA_{window}'] = df['Close'].rolling(window=window).mean()
-        df[f'MA_{window}'] = df[f'MA_{window}'].fillna(df['Close'])
+        close = frames.column('df_processed', 'Close')
+        # Panel data: keep each symbol's moving average within its own history
+        symbols = frames.column('df_processed', 'Symbol') if 'Symbol' in columns else None
+        
+        moving_average_key, engineered[f'MA_{window}'] = cache.run(
+            'moving_average', [preprocess_key], {'window': window},
+            lambda: moving_average(close, window, symbols)
+        )
         st.success(f"Added {window}-day Moving Average as a feature!")
     
-    numeric_cols = df.select_dtypes(include=np.number).columns.tolist()
+    st.subheader("Technical Indicators")
+    available = [name for name, (required, _) in INDICATORS.items() if all(c in columns for c in required)]
+    indicators_key = None
+    if available:
+        selected = st.multiselect("Indicators to generate", available)
+        windows_text = st.text_input("Windows (comma-separated)", ", ".join(map(str, DEFAULT_WINDOWS)))
+        if selected:
+            try:
+                windows = parse_windows(windows_text)
+                needed = sorted({c for name in selected for c in INDICATORS[name][0]})
+                symbols = frames.column('df_processed', 'Symbol') if 'Symbol' in columns else None
+                
+                def build_indicators():
+                    indicators = {name: windows for name in selected}
+                    # Data fetched from yfinance: only bars new since the last refresh are computed
+                    if st.session_state.pipeline['from_store'] and 'Date' in frames.columns('df'):
+                        stored = stored_indicators(
+                            symbols if symbols is not None else st.session_state.pipeline['last_symbol'],
+                            frames.column('df', 'Date'), indicators, get_ohlcv_store(), get_indicator_store()
+                        )
+                        if stored is not None:
+                            return stored.set_axis(frames.index)
+                    return compute_indicators(
+                        pd.DataFrame({c: frames.column('df_processed', c) for c in needed}),
+                        indicators,
+                        symbols
+                    )
+                
+                indicators_key, indicator_frame = cache.run(
+                    'indicators', [preprocess_key], {'indicators': selected, 'windows': windows},
+                    build_indicators
+                )
+                engineered = pd.concat([engineered, indicator_frame], axis=1)
+                st.success(f"Added {indicator_frame.shape[1]} indicator features!")
+            except Exception as e:
+                st.error(f"Error computing indicators: {str(e)}")
+    else:
+        st.info("Technical indicators need at least a Close column.")
+    
+    st.subheader("Lag Features")
+    lag_options = [c for c in columns if c != 'Symbol' and pd.api.types.is_numeric_dtype(frames.column('df_processed', c))]
+    lags = None
+    lags_key = None
+    if lag_options:
+        lag_column = st.selectbox("Column to lag", lag_options, index=lag_options.index('Close') if 'Close' in lag_options else 0)
+        max_lag = st.number_input("Number of lags (k)", min_value=0, max_value=500, value=0)
+        return_windows_text = st.text_input("Trailing return windows (comma-separated)", "1, 5, 20")
+        if max_lag:
+            try:
+                return_windows = parse_windows(return_windows_text)
+                symbols = frames.column('df_processed', 'Symbol') if 'Symbol' in columns else None
+                
+                # Only the strided view is cached; lag columns are materialized when selected below
+                lags_key, lags = cache.run(
+                    'lags', [preprocess_key], {'column': lag_column, 'max_lag': max_lag, 'return_windows': return_windows},
+                    lambda: LagFeatures(frames.column('df_processed', lag_column), max_lag, return_windows, symbols)
+                )
+                st.success(f"{len(lags.names())} lag features available ({lags.nbytes / 1024**2:.2f} MB for all {max_lag} lags)")
+            except Exception as e:
+                st.error(f"Error building lag features: {str(e)}")
+    
+    numeric_cols = [c for c in columns + list(engineered.columns) if pd.api.types.is_numeric_dtype(feature_column(c))]
     
     if not numeric_cols:
         st.error("No numeric columns found for analysis!")
@@ -998,48 +1246,86 @@ def feature_engineering_step():
     
     st.subheader("Feature Selection")
     target = st.selectbox("Select target variable (y)", numeric_cols)
-    features = st.multiselect("Select feature variables (X)", [c for c in numeric_cols if c != target])
+    lag_names = lags.names() if lags is not None else []
+    features = st.multiselect("Select feature variables (X)", [c for c in numeric_cols if c != target] + lag_names)
     
     if not features:
         st.warning("Please select at least one feature!")
         return
     
+    for feature in features:
+        if lags is not None and feature in lags:
+            engineered[feature] = lags.feature(feature)
+    
     st.subheader("Feature Scaling")
-    scale_features = st.checkbox("Scale features (Standardization)", value=True)
+    apply_scaling = st.checkbox("Scale features (Standardization)", value=True)
+    
+    features_key = cache.key('features', [preprocess_key, moving_average_key, indicators_key, lags_key], {'target': target, 'features': features, 'scale': apply_scaling})
     
-    if scale_features:
+    st.session_state.pipeline['scaler'] = None
+    if apply_scaling:
         try:
-            scaler = StandardScaler()
-            df[features] = scaler.fit_transform(df[features])
+            _, (scaled, scaler) = cache.run(
+                'scaling', [preprocess_key, moving_average_key, indicators_key, lags_key], {'features': features},
+                lambda: scale_features(pd.DataFrame({f: feature_column(f) for f in features}))
+            )
+            for i, feature in enumerate(features):
+                engineered[feature] = scaled[:, i]
+            st.session_state.pipeline['scaler'] = scaler
             st.success("Features successfully scaled!")
         except Exception as e:
             st.error(f"Error scaling features: {str(e)}")
     
     st.subheader("Feature Correlation")
+    corr_float32 = st.checkbox("Use float32 for correlations (faster, ~1e-7 precision)", value=False)
+    cluster = st.checkbox("Order by hierarchical clustering", value=len(features) > HEATMAP_TEXT_LIMIT)
+    threshold = st.slider("Hide correlations weaker than |r|", 0.0, 0.9, 0.0, 0.05)
     try:
-        corr_matrix = df[features + [target]].corr()
-        fig = px.imshow(
-            corr_matrix,
-            text_auto=True,
-            color_continuous_scale='RdBu_r',
-            title='Feature Correlation Matrix',
-            width=600,
-            height=500
+        # One engine per upstream data; changing the selection only adds/drops rows and columns
+        _, corr_engine = cache.run(
+            'correlation', [preprocess_key, moving_average_key, indicators_key, lags_key],
+            {'dtype': 'float32' if corr_float32 else 'float64'},
+            lambda: CorrelationEngine(np.float32 if corr_float32 else np.float64)
         )
-        fig.update_layout(
-    plot_bgcolor="rgba(30,30,30,0.9)",  # Graph background (dark translucent grey)
-    paper_bgcolor="rgba(30,30,30,0.9)", # Outer chart area
-    font=dict(color="white"),          # Font visibility
-    legend=dict(bgcolor="rgba(0,0,0,0.5)")  # Legend box clarity
-)
-
-        st.plotly_chart(fig)
+        corr_engine.update(features + [target], feature_column)
+        corr_matrix = corr_engine.matrix()
+        if cluster:
+            order = cluster_order(corr_matrix)
+            corr_matrix = corr_matrix.loc[order, order]
+        
+        top_k = st.number_input("Top-k correlations with the target", 1, max(1, len(features)), min(10, len(features)))
+        st.dataframe(top_correlations(corr_matrix, target, top_k).style.format({'Correlation': '{:.3f}', '|r|': '{:.3f}'}))
+        
+        display_matrix = heatmap_matrix(corr_matrix, threshold)
+        if len(display_matrix) < len(corr_matrix):
+            st.info(f"Showing {len(corr_matrix)} features as {len(display_matrix)} blocks (strongest correlation per block).")
+        def build_heatmap():
+            fig = px.imshow(
+                display_matrix,
+                text_auto='.2f' if len(display_matrix) <= HEATMAP_TEXT_LIMIT else False,
+                color_continuous_scale='RdBu_r',
+                zmin=-1,
+                zmax=1,
+                title='Feature Correlation Matrix',
+                width=600,
+                height=500
+            )
+            fig.update_layout(
+                plot_bgcolor="rgba(30,30,30,0.9)",  # Graph background (dark translucent grey)
+                paper_bgcolor="rgba(30,30,30,0.9)", # Outer chart area
+                font=dict(color="white"),          # Font visibility
+                legend=dict(bgcolor="rgba(0,0,0,0.5)")  # Legend box clarity
+            )
+            return fig
+        
+        st.plotly_chart(cached_figure('correlation_heatmap', [display_matrix], None, build_heatmap))
     except Exception as e:
         st.error(f"Could not create correlation matrix: {str(e)}")
     
     st.session_state.pipeline['target'] = target
     st.session_state.pipeline['features'] = features
-    st.session_state.pipeline['df_features'] = df
+    frames.set_stage('df_features', 'df_processed', engineered)
+    st.session_state.pipeline['stage_keys']['features'] = features_key
     st.session_state.pipeline['features_engineered'] = True
     
     if st.button("Continue to Train/Test Split"):
@@ -1050,7 +1336,8 @@ def feature_engineering_step():
 def train_test_split_step():
     st.header("Step 4: Train/Test Split ✂️")
     
-    if not st.session_state.pipeline['features_engineered']:
+    frames = st.session_state.pipeline['frames']
+    if not st.session_state.pipeline['features_engineered'] or frames is None or 'df_features' not in frames:
         st.warning("Please complete feature engineering first!")
         return
     
@@ -1058,50 +1345,82 @@ def train_test_split_step():
         st.error("Target or features not selected!")
         return
     
-    df = st.session_state.pipeline['df_features']
     target = st.session_state.pipeline['target']
     features = st.session_state.pipeline['features']
     
     st.subheader("Split Configuration")
-    test_size = st.slider("Test set size (%)", 10, 40, 20)
-    random_state = st.number_input("Random state", 0, 100, 42)
+    split_method = st.radio("Split method", ["Random split", "Walk-forward (time-ordered folds)"])
+    dates = frames.column('df', 'Date') if 'Date' in frames.columns('df') else None
     
     try:
-        X = df[features]
-        y = df[target]
-        
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, 
-            test_size=test_size/100, 
-            random_state=random_state
-        )
+        if split_method == "Random split":
+            test_size = st.slider("Test set size (%)", 10, 40, 20)
+            random_state = st.number_input("Random state", 0, 100, 42)
+            
+            # Only row positions are stored; X/y are materialized when a step needs them
+            split_key, (train_rows, test_rows) = st.session_state.stage_cache.run(
+                'split', [frames.fingerprint], {'test_size': test_size, 'random_state': random_state},
+                lambda: split_rows(frames.n_rows, test_size, random_state)
+            )
+            st.session_state.pipeline['cv_folds'] = None
+        else:
+            n_folds = st.slider("Number of folds", 2, 20, 5)
+            cv_mode = st.radio("Training window", WALK_FORWARD_MODES, horizontal=True)
+            cv_train_size = None
+            if cv_mode == "Rolling window":
+                cv_train_size = st.number_input("Rolling training window (rows)", 10, frames.n_rows, max(10, frames.n_rows // (n_folds + 1)))
+            cv_gap = st.number_input("Gap between training and test rows", 0, 250, 0)
+            if dates is None:
+                st.info("No Date column found: rows are assumed to be in time order.")
+            
+            split_key, folds = st.session_state.stage_cache.run(
+                'split', [frames.fingerprint],
+                {'folds': n_folds, 'mode': cv_mode, 'train_size': cv_train_size, 'gap': cv_gap},
+                lambda: walk_forward_folds(frames.n_rows, n_folds, cv_mode, cv_train_size, gap=cv_gap, dates=dates)
+            )
+            st.session_state.pipeline['cv_folds'] = folds
+            # The last fold is the holdout used by training, evaluation and results
+            train_rows, test_rows = folds[-1]
+            
+            fold_sizes = pd.DataFrame({
+                'Fold': range(1, len(folds) + 1),
+                'Train Rows': [len(train) for train, _ in folds],
+                'Test Rows': [len(test) for _, test in folds],
+            })
+            if dates is not None:
+                fold_sizes['Test Start'] = [dates.iloc[test].min() for _, test in folds]
+                fold_sizes['Test End'] = [dates.iloc[test].max() for _, test in folds]
+            with st.expander("View Folds"):
+                st.dataframe(fold_sizes)
         
-        st.session_state.pipeline['X_train'] = X_train
-        st.session_state.pipeline['X_test'] = X_test
-        st.session_state.pipeline['y_train'] = y_train
-        st.session_state.pipeline['y_test'] = y_test
+        frames.set_rows('train', train_rows)
+        frames.set_rows('test', test_rows)
+        st.session_state.pipeline['stage_keys']['split'] = split_key
         st.session_state.pipeline['data_split'] = True
         
         st.subheader("Data Split Visualization")
         split_df = pd.DataFrame({
             'Set': ['Training', 'Testing'],
-            'Size': [len(X_train), len(X_test)]
+            'Size': [len(train_rows), len(test_rows)]
         })
-        fig = px.pie(
-            split_df,
-            names='Set',
-            values='Size',
-            title='Training vs Testing Split',
-            width=400,
-            height=400,
-            color_discrete_sequence=['#1E90FF', '#FF4500']
-        )
-        fig.update_layout(
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font_color='#e0e0e0'
-        )
-        st.plotly_chart(fig)
+        def build_split_pie():
+            fig = px.pie(
+                split_df,
+                names='Set',
+                values='Size',
+                title='Training vs Testing Split',
+                width=400,
+                height=400,
+                color_discrete_sequence=['#1E90FF', '#FF4500']
+            )
+            fig.update_layout(
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                font_color='#e0e0e0'
+            )
+            return fig
+        
+        st.plotly_chart(cached_figure('split_pie', [len(train_rows), len(test_rows)], None, build_split_pie))
         
         st.success("Train/test split completed!")
         
@@ -1120,64 +1439,227 @@ def model_training_step():
         st.warning("Please complete train/test split first!")
         return
     
-    X_train = st.session_state.pipeline['X_train']
-    y_train = st.session_state.pipeline['y_train']
+    frames = st.session_state.pipeline['frames']
+    stage_keys = st.session_state.pipeline['stage_keys']
+    target = st.session_state.pipeline['target']
+    features = st.session_state.pipeline['features']
+    y_train = frames.series('df_features', target, rows='train')
     
     st.subheader("Model Configuration")
-    model_type = st.selectbox("Select Model to Train", ["Linear Regression", "Logistic Regression", "K-Nearest Neighbors"])
-    
     target_is_continuous = is_continuous(y_train)
+    train_all = st.checkbox("Train all applicable models concurrently")
     
-    if model_type == "Linear Regression" and not target_is_continuous:
-        st.warning("""
-            ⚠️ Linear Regression expects a continuous target variable (e.g., stock prices). 
-            Your target variable appears to be categorical. Consider discretizing it in preprocessing 
-            or selecting a different model like Logistic Regression for classification tasks.
-        """)
-        return
-    elif model_type == "Logistic Regression" and target_is_continuous:
-        st.warning("""
-            ⚠️ Logistic Regression expects a categorical target variable (e.g., buy/sell, 0/1). 
-            Your target variable appears to be continuous. You can discretize it in the preprocessing step 
-            (e.g., convert to categories like 'high'/'low') or select a different model like Linear Regression.
-        """)
-        return
-    elif model_type == "K-Nearest Neighbors" and not target_is_continuous:
+    if train_all:
+        model_types = applicable_models(target_is_continuous)
+        st.info(f"Training {', '.join(model_types)} in parallel.")
+    else:
+        model_type = st.selectbox("Select Model to Train", MODEL_TYPES)
+        
+        if model_type == "Linear Regression" and not target_is_continuous:
+            st.warning("""
+                ⚠️ Linear Regression expects a continuous target variable (e.g., stock prices). 
+                Your target variable appears to be categorical. Consider discretizing it in preprocessing 
+                or selecting a different model like Logistic Regression for classification tasks.
+            """)
+            return
+        elif model_type == "Logistic Regression" and target_is_continuous:
+            st.warning("""
+                ⚠️ Logistic Regression expects a categorical target variable (e.g., buy/sell, 0/1). 
+                Your target variable appears to be continuous. You can discretize it in the preprocessing step 
+                (e.g., convert to categories like 'high'/'low') or select a different model like Linear Regression.
+            """)
+            return
+        model_types = [model_type]
+    
+    if "K-Nearest Neighbors" in model_types and not target_is_continuous:
         st.info("K-Nearest Neighbors will be used as a classifier for categorical target.")
     
-    models = {}
-    if model_type == "Linear Regression":
-        models[model_type] = LinearRegression()
-    elif model_type == "Logistic Regression":
-        models[model_type] = LogisticRegression(max_iter=1000)
-    elif model_type == "K-Nearest Neighbors":
-        n_neighbors = st.number_input("Number of neighbors (k)", min_value=1, max_value=50, value=5, key="n_neighbors")
-        if target_is_continuous:
-            models[model_type] = KNeighborsRegressor(n_neighbors=n_neighbors)
-        else:
-            models[model_type] = KNeighborsClassifier(n_neighbors=n_neighbors)
+    n_neighbors, knn_backend, leaf_size, n_probe = 5, "Auto", DEFAULT_LEAF_SIZE, DEFAULT_N_PROBE
+    if "K-Nearest Neighbors" in model_types:
+        n_neighbors = st.number_input("Number of neighbors (k)", min_value=1, max_value=KNN_SWEEP_MAX_K, key="n_neighbors")
+        
+        if st.checkbox(f"Sweep k = 1..{KNN_SWEEP_MAX_K} with a single neighbor query"):
+            try:
+                def run_sweep():
+                    # Validate on the last part of the training rows so the test set stays unseen
+                    X_train, _ = get_split('train')
+                    fit_rows, validation_rows = validation_split(len(X_train))
+                    return knn_sweep(
+                        X_train.iloc[fit_rows], y_train.iloc[fit_rows],
+                        X_train.iloc[validation_rows], y_train.iloc[validation_rows],
+                        classifier=not target_is_continuous
+                    )
+                
+                _, (curve, best_k) = st.session_state.stage_cache.run(
+                    'knn_sweep', [stage_keys['features'], stage_keys['split']],
+                    {'max_k': KNN_SWEEP_MAX_K, 'classifier': not target_is_continuous}, run_sweep
+                )
+                score = 'RMSE' if target_is_continuous else 'Accuracy'
+                def build_curve():
+                    fig = px.line(curve, x='k', y=score, markers=True, title='KNN Validation Curve')
+                    fig.add_vline(x=best_k, line_dash='dash', line_color='#FF4500')
+                    fig.update_layout(
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        font_color='#e0e0e0'
+                    )
+                    return fig
+                
+                st.plotly_chart(cached_figure('knn_curve', [curve, best_k], {'score': score}, build_curve))
+                best = curve.loc[curve['k'] == best_k].iloc[0]
+                st.success(f"Recommended k: {best_k} (validation {score}: {best[score]:.4f})")
+                if best_k != n_neighbors:
+                    st.button(f"Use k = {best_k}", on_click=lambda: st.session_state.update(n_neighbors=best_k))
+            except Exception as e:
+                st.error(f"Error during KNN sweep: {str(e)}")
+        
+        # Neighbor index: exact trees suit a few features, the approximate index many features
+        knn_backend = st.selectbox("Neighbor index", KNN_INDEX_BACKENDS)
+        if knn_backend in TREE_BACKENDS:
+            leaf_size = st.number_input("Leaf size", min_value=1, max_value=1000, key="knn_leaf_size")
+        elif knn_backend == "Approximate (IVF)":
+            n_probe = st.number_input("Cells probed per query", min_value=1, max_value=256, value=DEFAULT_N_PROBE,
+                                      help="More cells means higher recall and slower queries.")
+        
+        if st.checkbox("Benchmark neighbor index backends"):
+            try:
+                def run_benchmark():
+                    # Query with the last part of the training rows, as the k sweep does
+                    X_train, _ = get_split('train')
+                    fit_rows, query_rows = validation_split(len(X_train))
+                    return benchmark_backends(
+                        X_train.iloc[fit_rows], y_train.iloc[fit_rows],
+                        X_train.iloc[query_rows], n_neighbors
+                    )
+                
+                with st.spinner("Benchmarking index backends..."):
+                    _, benchmark = st.session_state.stage_cache.run(
+                        'knn_benchmark', [stage_keys['features'], stage_keys['split']],
+                        {'n_neighbors': n_neighbors}, run_benchmark
+                    )
+                st.dataframe(benchmark)
+                st.caption("Recall@k and prediction RMSE are measured against exact brute-force neighbors.")
+                best_leaf = best_leaf_sizes(benchmark).get(knn_backend)
+                if best_leaf is not None and best_leaf != leaf_size:
+                    st.button(f"Use leaf size {best_leaf}", on_click=lambda: st.session_state.update(knn_leaf_size=best_leaf))
+            except Exception as e:
+                st.error(f"Error benchmarking index backends: {str(e)}")
+    
+    online = False
+    if "Linear Regression" in model_types:
+        online = st.checkbox(
+            "Incremental Linear Regression (X'X / X'y sufficient statistics)",
+            help="Same coefficients as a batch fit. Expanding walk-forward folds only absorb the rows each fold adds."
+        )
+    
+    models = {
+        model_type: build_model(model_type, target_is_continuous, n_neighbors, knn_backend, leaf_size, n_probe, online)
+        for model_type in model_types
+    }
     
-    with st.spinner("Training model..."):
+    with st.spinner("Training models..." if len(models) > 1 else "Training model..."):
         try:
-            model = models[model_type]
-            model.fit(X_train, y_train)
-            models[model_type] = model
+            # Refit only when the features, the split or the hyperparameters changed
+            cache = st.session_state.stage_cache
+            train_keys = {
+                model_type: cache.key('train', [stage_keys['features'], stage_keys['split']],
+                                      {'model': model_type, 'target': target, 'params': model.get_params()})
+                for model_type, model in models.items()
+            }
+            fit_seconds = st.session_state.pipeline['fit_seconds']
+            stale = {}
+            for model_type, train_key in train_keys.items():
+                found, cached = cache.lookup('train', train_key)
+                if found:
+                    models[model_type], fit_seconds[model_type] = cached
+                else:
+                    stale[model_type] = models[model_type]
+            
+            # Then the artifact store on disk (the train key fingerprints data, split, target and
+            # parameters; load() also rejects artifacts saved for another target or feature list)
+            artifact_store = get_artifact_store()
+            loaded = []
+            for model_type in list(stale):
+                artifact = artifact_store.load(train_keys[model_type], target, features)
+                if artifact is not None:
+                    seconds = artifact_store.metadata(train_keys[model_type]).get('fit_seconds', np.nan)
+                    cache.store('train', train_keys[model_type], (artifact['model'], seconds))
+                    models[model_type], fit_seconds[model_type] = artifact['model'], seconds
+                    loaded.append(model_type)
+                    del stale[model_type]
+            if loaded:
+                st.info(f"Loaded {', '.join(loaded)} from the model artifact store instead of refitting.")
+            
+            if stale:
+                X_train, _ = get_split('train')
+                for model_type, (model, seconds) in fit_models(stale, X_train, y_train).items():
+                    cache.store('train', train_keys[model_type], (model, seconds))
+                    models[model_type], fit_seconds[model_type] = model, seconds
+                    artifact_store.save(
+                        train_keys[model_type], model,
+                        features, target,
+                        scaler=st.session_state.pipeline['scaler'],
+                        model_name=model_type, fit_seconds=seconds, params=model.get_params()
+                    )
             
             st.session_state.pipeline['models'] = models
+            stage_keys['train'] = train_keys
             st.session_state.pipeline['model_trained'] = True
-            st.success("Model training completed!")
+            st.success("Model training completed!" if len(models) == 1 else f"Trained {len(models)} models!")
             
             st.subheader("Model Details")
-            st.write(f"**{model_type}**")
-            if model_type in ["Linear Regression", "Logistic Regression"] and hasattr(model, 'coef_'):
-                coef_df = pd.DataFrame({
-                    'Feature': ['Intercept'] + st.session_state.pipeline['features'],
-                    'Coefficient': [model.intercept_] + list(model.coef_)
-                })
-                st.dataframe(coef_df)
-            elif model_type == "K-Nearest Neighbors":
-                st.write(f"Number of neighbors: {n_neighbors}")
-                st.write("KNN does not provide feature coefficients, but relies on distance-based predictions.")
+            for model_type, model in models.items():
+                st.write(f"**{model_type}** (fit in {fit_seconds[model_type]:.3f}s)")
+                if model_type in ["Linear Regression", "Logistic Regression"] and hasattr(model, 'coef_'):
+                    coef_df = pd.DataFrame({
+                        'Feature': ['Intercept'] + st.session_state.pipeline['features'],
+                        'Coefficient': [model.intercept_] + list(model.coef_)
+                    })
+                    st.dataframe(coef_df)
+                elif model_type == "K-Nearest Neighbors":
+                    st.write(f"Number of neighbors: {n_neighbors} ({knn_backend} index)")
+                    st.write("KNN does not provide feature coefficients, but relies on distance-based predictions.")
+            
+            with st.expander("Saved Model Artifacts"):
+                artifacts = artifact_store.list()
+                if artifacts:
+                    st.dataframe(pd.DataFrame(artifacts)[['key', 'model_name', 'target', 'features', 'scaled', 'fit_seconds', 'created']])
+                else:
+                    st.write("No saved models yet.")
+            
+            cv_folds = st.session_state.pipeline['cv_folds']
+            if cv_folds:
+                st.subheader("Walk-forward Cross-Validation")
+                if st.checkbox(f"Score {' / '.join(models)} on all {len(cv_folds)} walk-forward folds"):
+                    with st.spinner("Fitting folds in parallel..."):
+                        summaries, fold_scores = [], []
+                        for model_type, model in models.items():
+                            def run_cv():
+                                X, y = get_split(None)
+                                dates = frames.column('df', 'Date') if 'Date' in frames.columns('df') else None
+                                return walk_forward_cv(model, X, y, cv_folds, dates)
+                            
+                            _, (per_fold, summary) = cache.run(
+                                'walk_forward', [stage_keys['features'], stage_keys['split']],
+                                {'model': model_type, 'params': model.get_params()}, run_cv
+                            )
+                            summaries.append({'Model': model_type, **summary})
+                            fold_scores.append(per_fold.assign(Model=model_type))
+                        fold_scores = pd.concat(fold_scores, ignore_index=True)
+                    
+                    st.dataframe(pd.DataFrame(summaries).style.format(precision=4))
+                    with st.expander("Per-fold Scores"):
+                        st.dataframe(fold_scores.style.format({'RMSE': '{:.4f}', 'R²': '{:.4f}', 'Fit (s)': '{:.3f}'}))
+                    def build_fold_chart():
+                        fig = px.line(fold_scores, x='Fold', y='RMSE', color='Model', markers=True, title='RMSE per Walk-forward Fold')
+                        fig.update_layout(
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            plot_bgcolor='rgba(0,0,0,0)',
+                            font_color='#e0e0e0'
+                        )
+                        return fig
+                    
+                    st.plotly_chart(cached_figure('walk_forward_folds', [fold_scores], None, build_fold_chart))
             
             if st.button("Continue to Evaluation"):
                 st.session_state.pipeline['current_step'] = 6
@@ -1195,63 +1677,90 @@ def evaluation_step():
         return
     
     models = st.session_state.pipeline['models']
-    X_test = st.session_state.pipeline['X_test']
-    y_test = st.session_state.pipeline['y_test']
+    stage_keys = st.session_state.pipeline['stage_keys']
+    frames = st.session_state.pipeline['frames']
+    y_test = frames.series('df_features', st.session_state.pipeline['target'], rows='test')
     
     y_preds = {}
+    predict_seconds = {}
     try:
-        for model_type, model in models.items():
-            y_pred = model.predict(X_test)
-            y_preds[model_type] = y_pred
+        # Predictions are reused until the model or the split changes; missing ones run concurrently
+        cache = st.session_state.stage_cache
+        predict_keys = {model_type: cache.key('predict', [stage_keys['train'][model_type], stage_keys['split']]) for model_type in models}
+        stale = {}
+        for model_type, predict_key in predict_keys.items():
+            found, cached = cache.lookup('predict', predict_key)
+            if found:
+                y_preds[model_type], predict_seconds[model_type] = cached
+            else:
+                stale[model_type] = models[model_type]
+        if stale:
+            X_test, _ = get_split('test')
+            for model_type, (y_pred, seconds) in predict_models(stale, X_test).items():
+                cache.store('predict', predict_keys[model_type], (y_pred, seconds))
+                y_preds[model_type], predict_seconds[model_type] = y_pred, seconds
+        y_preds = {model_type: y_preds[model_type] for model_type in models}
         
         st.session_state.pipeline['y_preds'] = y_preds
         
         st.subheader("Model Performance Metrics")
-        metrics_df = pd.DataFrame(columns=['Model', 'RMSE', 'R²'])
-        for model_type, y_pred in y_preds.items():
-            mse = mean_squared_error(y_test, y_pred)
-            rmse = np.sqrt(mse)
-            r2 = r2_score(y_test, y_pred)
-            metrics_df = pd.concat([metrics_df, pd.DataFrame({
-                'Model': [model_type],
-                'RMSE': [rmse],
-                'R²': [r2]
-            })], ignore_index=True)
+        fit_seconds = st.session_state.pipeline['fit_seconds']
+        # Metrics of all models in one pass, cached by a hash of the targets and predictions
+        predictions_key = fingerprint(y_test, *y_preds.values())
+        _, metrics_df = cache.run('metrics', [predictions_key], {'models': list(y_preds)},
+                                  lambda: metrics_table(y_test, y_preds))
+        metrics_df = metrics_df.assign(**{
+            'Fit (s)': [fit_seconds.get(model_type, np.nan) for model_type in y_preds],
+            'Predict (s)': [predict_seconds[model_type] for model_type in y_preds],
+        })
         
-        st.dataframe(metrics_df.style.format({'RMSE': '{:.4f}', 'R²': '{:.4f}'}))
+        if st.checkbox("Bootstrap confidence intervals"):
+            n_resamples = st.number_input("Bootstrap resamples", min_value=100, max_value=20000, value=BOOTSTRAP_RESAMPLES, step=100)
+            _, intervals = cache.run('metric_intervals', [predictions_key],
+                                     {'models': list(y_preds), 'n_resamples': n_resamples, 'confidence': BOOTSTRAP_CONFIDENCE},
+                                     lambda: bootstrap_intervals(y_test, y_preds, n_resamples))
+            metrics_df = metrics_df.merge(intervals, on='Model')
+            st.caption(f"{BOOTSTRAP_CONFIDENCE:.0%} percentile intervals from {n_resamples:,} resamples of the test rows.")
+        
+        st.dataframe(metrics_df.style.format({column: '{:.4f}' for column in metrics_df.columns if column not in ['Model', 'Rows']}))
         
         st.subheader("Actual vs Predicted Values")
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=y_test,
-            y=y_test,
-            mode='lines',
-            name='Ideal Fit',
-            line=dict(color='black', dash='dash')
-        ))
-        for model_type, y_pred in y_preds.items():
+        def build_actual_vs_predicted():
+            fig = go.Figure()
             fig.add_trace(go.Scatter(
-                x=y_test,
-                y=y_pred,
-                mode='markers',
-                name=f'{model_type} Predictions',
-                marker=dict(size=8)
+                x=[y_test.min(), y_test.max()],
+                y=[y_test.min(), y_test.max()],
+                mode='lines',
+                name='Ideal Fit',
+                line=dict(color='black', dash='dash')
             ))
+            for model_type, y_pred in y_preds.items():
+                # Beyond the point budget, keep the extremes of every bucket of actual values
+                rows, n_points = downsample_series(y_test, y_pred, POINT_BUDGET, method="Min/Max")
+                fig.add_trace(scatter_trace(
+                    n_points,
+                    x=y_test.iloc[rows],
+                    y=np.asarray(y_pred)[rows],
+                    mode='markers',
+                    name=f'{model_type} Predictions',
+                    marker=dict(size=8)
+                ))
+            
+            fig.update_layout(
+                title='Actual vs Predicted Values',
+                xaxis_title='Actual',
+                yaxis_title='Predicted',
+                paper_bgcolor='rgba(15, 15, 15, 0.8)',
+                plot_bgcolor='rgba(25, 25, 25, 0.8)',
+                font_color='#e0e0e0',
+                legend=dict(
+                    bgcolor='rgba(50,50,50,0.8)',
+                    bordercolor='rgba(255,255,255,0.2)'
+                )
+            )
+            return fig
         
-        fig.update_layout(
-    title='Actual vs Predicted Values',
-    xaxis_title='Actual',
-    yaxis_title='Predicted',
-    paper_bgcolor='rgba(15, 15, 15, 0.8)',
-    plot_bgcolor='rgba(25, 25, 25, 0.8)',
-    font_color='#e0e0e0',
-    legend=dict(
-        bgcolor='rgba(50,50,50,0.8)',
-        bordercolor='rgba(255,255,255,0.2)'
-    )
-)
-
-        st.plotly_chart(fig)
+        st.plotly_chart(cached_figure('actual_vs_predicted', [predictions_key], {'models': list(y_preds)}, build_actual_vs_predicted))
         
         st.session_state.pipeline['model_evaluated'] = True
         
@@ -1262,6 +1771,111 @@ def evaluation_step():
     except Exception as e:
         st.error(f"Error during model evaluation: {str(e)}")
 
+# Interactive prediction and what-if widget. As a fragment, moving a slider reruns only this
+# function instead of the whole script; the compiled predictor, the feature bounds and the
+# partial-dependence sample come in precomputed.
+@st.fragment
+def interactive_prediction(predictor, bounds, sample, model_key):
+    st.write("Adjust the feature values to see how they affect the prediction:")
+    
+    values = np.empty(len(bounds['features']))
+    for i, feature in enumerate(bounds['features']):
+        min_val = float(bounds['min'][i])
+        max_val = float(bounds['max'][i])
+        values[i] = st.slider(
+            f"{feature}",
+            min_value=min_val,
+            max_value=max_val,
+            value=float(bounds['mean'][i]),
+            step=(max_val - min_val) / 100
+        )
+    
+    started = time.perf_counter()
+    prediction = predictor.predict_one(values)
+    predict_ms = 1000 * (time.perf_counter() - started)
+    
+    st.subheader("Prediction Result")
+    st.metric("Predicted Value", f"{prediction:.2f}")
+    st.caption(f"Predicted in {predict_ms:.3f} ms")
+    
+    # Radar chart of the inputs, normalized to each feature's range. Built on every slider move
+    # rather than cached: the inputs change each time and would only evict other figures.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized = (values - bounds['min']) / (bounds['max'] - bounds['min'])
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=normalized,
+        theta=bounds['features'],
+        fill='toself',
+        name='Feature Values'
+    ))
+    
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 1]
+            )
+        ),
+        title="Feature Values (Normalized)",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font_color='#e0e0e0'
+    )
+    
+    st.plotly_chart(fig)
+    
+    # What-if grids: sweep one or two features, predicted in one batched call
+    st.subheader("What-if Analysis")
+    sweep = st.multiselect("Features to sweep (one or two)", bounds['features'], default=bounds['features'][:1], max_selections=2)
+    hold = st.radio("Other features", ["Held at the slider values", f"Averaged over {len(sample)} data rows (partial dependence)"], horizontal=True)
+    n_points = st.number_input("Grid points per feature", min_value=2, max_value=10000 if len(sweep) < 2 else 500, value=200 if len(sweep) < 2 else 100)
+    
+    if sweep:
+        try:
+            grids = {feature: feature_grid(bounds, feature, n_points) for feature in sweep}
+            rows = values if hold == "Held at the slider values" else sample
+            started = time.perf_counter()
+            if rows is values:
+                grid = grid_predictions(predictor, rows, grids)
+            else:
+                # Partial dependence does not depend on the sliders: computed once per model and grid
+                _, grid = st.session_state.stage_cache.run(
+                    'partial_dependence', [model_key], {'features': sweep, 'n_points': n_points},
+                    lambda: grid_predictions(predictor, rows, grids)
+                )
+            grid_ms = 1000 * (time.perf_counter() - started)
+            label = "Predicted Value"
+            if predictor.is_classifier:
+                classes = list(predictor.classes)
+                shown = st.selectbox("Class probability to plot", classes, index=len(classes) - 1)
+                grid = grid[..., classes.index(shown)]
+                label = f"P(class = {shown})"
+            current = {feature: values[bounds['features'].index(feature)] for feature in sweep}
+            
+            if len(sweep) == 1:
+                feature = sweep[0]
+                fig = px.line(x=grids[feature], y=grid, labels={'x': feature, 'y': label},
+                              title=f"{'What-if' if rows is values else 'Partial Dependence'}: {feature}")
+                fig.add_vline(x=current[feature], line_dash='dash', line_color='#FF4500')
+            else:
+                x_feature, y_feature = sweep
+                fig = go.Figure(go.Heatmap(x=grids[x_feature], y=grids[y_feature], z=grid.T, colorscale='Viridis', colorbar=dict(title=label)))
+                fig.add_trace(go.Scatter(x=[current[x_feature]], y=[current[y_feature]], mode='markers',
+                                         marker=dict(color='#FF4500', size=10), name='Current inputs'))
+                fig.update_layout(title=f"{'What-if' if rows is values else 'Partial Dependence'}: {x_feature} × {y_feature}",
+                                  xaxis_title=x_feature, yaxis_title=y_feature)
+            fig.update_layout(
+                paper_bgcolor='rgba(0,0,0,0)',
+                plot_bgcolor='rgba(0,0,0,0)',
+                font_color='#e0e0e0'
+            )
+            st.plotly_chart(fig)
+            st.caption(f"{grid.size:,} grid points × {len(np.atleast_2d(rows))} rows in {grid_ms:.1f} ms")
+        except Exception as e:
+            st.error(f"Error computing what-if grid: {str(e)}")
+
 # Step 7: Results Visualization
 def results_visualization_step():
     st.header("Step 7: Results Visualization 📈")
@@ -1270,11 +1884,14 @@ def results_visualization_step():
         st.warning("Please evaluate the model first!")
         return
     
-    df = st.session_state.pipeline['df_features']
+    frames = st.session_state.pipeline['frames']
     target = st.session_state.pipeline['target']
     features = st.session_state.pipeline['features']
-    y_test = st.session_state.pipeline['y_test']
+    columns = list(dict.fromkeys([c for c in ['Date', 'Close'] if c in frames.columns('df_features')] + features + [target]))
+    df = frames.frame('df_features', columns=columns)
+    y_test = frames.series('df_features', target, rows='test')
     y_preds = st.session_state.pipeline['y_preds']
+    stage_keys = st.session_state.pipeline['stage_keys']
     
     st.subheader("Interactive Visualizations")
     
@@ -1295,21 +1912,24 @@ def results_visualization_step():
                     'Importance': importance
                 }).sort_values('Importance', ascending=False)
                 
-                fig = px.bar(
-                    importance_df,
-                    x='Feature',
-                    y='Importance',
-                    title=f'Feature Importance - {model_type}',
-                    color='Importance',
-                    color_continuous_scale='Viridis'
-                )
-                fig.update_layout(
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    font_color='#e0e0e0',
-                    xaxis={'categoryorder':'total descending'}
-                )
-                st.plotly_chart(fig)
+                def build_importance():
+                    fig = px.bar(
+                        importance_df,
+                        x='Feature',
+                        y='Importance',
+                        title=f'Feature Importance - {model_type}',
+                        color='Importance',
+                        color_continuous_scale='Viridis'
+                    )
+                    fig.update_layout(
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        font_color='#e0e0e0',
+                        xaxis={'categoryorder':'total descending'}
+                    )
+                    return fig
+                
+                st.plotly_chart(cached_figure('feature_importance', [stage_keys['train'][model_type]], {'model': model_type, 'features': features}, build_importance))
             else:
                 st.info(f"Feature importance visualization not available for {model_type}")
         except Exception as e:
@@ -1326,42 +1946,65 @@ def results_visualization_step():
                 model_type = list(st.session_state.pipeline['models'].keys())[0]
                 
                 if st.checkbox("Show prediction in context", value=True):
-                    fig = go.Figure()
+                    # Long histories are downsampled to a point budget for the visible window
+                    chart_key = 'time_series_chart'
+                    window = chart_zoom_window(chart_key)
+                    method = st.radio("Downsampling", DOWNSAMPLE_METHODS, horizontal=True)
+                    # The figure (with the shown/visible point counts for the caption) is cached
+                    # per data, zoom window and method
+                    def build_time_series():
+                        rows, n_visible = downsample_series(date_col, close_col, POINT_BUDGET, window, method)
+                        fig = go.Figure()
                     
-                    # Original data
-                    fig.add_trace(go.Scatter(
-                        x=date_col,
-                        y=close_col,
-                        mode='lines',
-                        name='Actual Price',
-                        line=dict(color='#4C78A8', width=2)
-                    ))
+                        # Original data
+                        fig.add_trace(scatter_trace(
+                            n_visible,
+                            x=date_col.iloc[rows],
+                            y=close_col.iloc[rows],
+                            mode='lines',
+                            name='Actual Price',
+                            line=dict(color='#4C78A8', width=2)
+                        ))
                     
-                    # Test set indices
-                    test_indices = y_test.index
+                        # Test set indices
+                        test_indices = y_test.index
+                        test_dates = date_col.iloc[test_indices]
+                        pred_rows, n_predictions = downsample_series(test_dates, y_preds[model_type], POINT_BUDGET, window, "Min/Max")
                     
-                    # Model predictions
-                    fig.add_trace(go.Scatter(
-                        x=date_col.iloc[test_indices],
-                        y=y_preds[model_type],
-                        mode='markers',
-                        name=f'{model_type} Predictions',
-                        marker=dict(size=8, color='#E45756')
-                    ))
+                        # Model predictions
+                        fig.add_trace(scatter_trace(
+                            n_predictions,
+                            x=test_dates.iloc[pred_rows],
+                            y=np.asarray(y_preds[model_type])[pred_rows],
+                            mode='markers',
+                            name=f'{model_type} Predictions',
+                            marker=dict(size=8, color='#E45756')
+                        ))
                     
-                    fig.update_layout(
-                        title='Stock Price Prediction Over Time',
-                        xaxis_title='Date',
-                        yaxis_title='Price',
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        font_color='#e0e0e0',
-                        legend=dict(
-                            bgcolor='rgba(50,50,50,0.8)',
-                            bordercolor='rgba(255,255,255,0.2)'
+                        fig.update_layout(
+                            title='Stock Price Prediction Over Time',
+                            xaxis_title='Date',
+                            yaxis_title='Price',
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            plot_bgcolor='rgba(0,0,0,0)',
+                            font_color='#e0e0e0',
+                            legend=dict(
+                                bgcolor='rgba(50,50,50,0.8)',
+                                bordercolor='rgba(255,255,255,0.2)'
+                            )
                         )
+                        return fig, len(rows), n_visible
+                    
+                    fig, n_shown, n_visible = cached_figure(
+                        'time_series', [stage_keys['features'], stage_keys['split'], y_preds[model_type]],
+                        {'model': model_type, 'window': window, 'method': method}, build_time_series
                     )
-                    st.plotly_chart(fig)
+                    st.plotly_chart(fig, key=chart_key, on_select="rerun", selection_mode="box")
+                    st.caption(f"Showing {n_shown:,} of {n_visible:,} price points"
+                               f"{' in the zoomed range' if window is not None else ''}. "
+                               "Box-select a date range on the chart to zoom in at full detail.")
+                    if window is not None:
+                        st.button("Reset zoom", on_click=lambda: st.session_state.pop(f'{chart_key}_zoom', None))
                     
                     # If we have current price, show potential future prediction
                     if st.session_state.pipeline['current_price'] is not None and st.session_state.pipeline['last_symbol'] is not None:
@@ -1394,48 +2037,58 @@ def results_visualization_step():
     with tab3:
         st.subheader("Model Performance Comparison")
         try:
-            metrics_df = pd.DataFrame(columns=['Model', 'RMSE', 'R²'])
-            for model_type, y_pred in y_preds.items():
-                mse = mean_squared_error(y_test, y_pred)
-                rmse = np.sqrt(mse)
-                r2 = r2_score(y_test, y_pred)
-                metrics_df = pd.concat([metrics_df, pd.DataFrame({
-                    'Model': [model_type],
-                    'RMSE': [rmse],
-                    'R²': [r2]
-                })], ignore_index=True)
+            # Same cache entries as the evaluation step; error bars are bootstrap intervals
+            cache = st.session_state.stage_cache
+            predictions_key = fingerprint(y_test, *y_preds.values())
+            _, metrics_df = cache.run('metrics', [predictions_key], {'models': list(y_preds)},
+                                      lambda: metrics_table(y_test, y_preds))
+            _, intervals = cache.run('metric_intervals', [predictions_key],
+                                     {'models': list(y_preds), 'n_resamples': BOOTSTRAP_RESAMPLES, 'confidence': BOOTSTRAP_CONFIDENCE},
+                                     lambda: bootstrap_intervals(y_test, y_preds))
+            metrics_df = metrics_df.merge(intervals, on='Model')
+            for metric in ['RMSE', 'R²']:
+                metrics_df[f'{metric} Above'] = metrics_df[f'{metric} High'] - metrics_df[metric]
+                metrics_df[f'{metric} Below'] = metrics_df[metric] - metrics_df[f'{metric} Low']
             
-            fig1 = px.bar(
-                metrics_df,
-                x='Model',
-                y='RMSE',
-                title='RMSE by Model (Lower is Better)',
-                color='Model'
-            )
-            fig1.update_layout(
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font_color='#e0e0e0'
-            )
+            def build_rmse_bars():
+                fig1 = px.bar(
+                    metrics_df,
+                    x='Model',
+                    y='RMSE',
+                    error_y='RMSE Above',
+                    error_y_minus='RMSE Below',
+                    title='RMSE by Model (Lower is Better)',
+                    color='Model'
+                )
+                fig1.update_layout(
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    font_color='#e0e0e0'
+                )
+                return fig1
             
-            fig2 = px.bar(
-                metrics_df,
-                x='Model',
-                y='R²',
-                title='R² by Model (Higher is Better)',
-                color='Model'
-            )
-            fig2.update_layout(
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font_color='#e0e0e0'
-            )
+            def build_r2_bars():
+                fig2 = px.bar(
+                    metrics_df,
+                    x='Model',
+                    y='R²',
+                    error_y='R² Above',
+                    error_y_minus='R² Below',
+                    title='R² by Model (Higher is Better)',
+                    color='Model'
+                )
+                fig2.update_layout(
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    font_color='#e0e0e0'
+                )
+                return fig2
             
             col1, col2 = st.columns(2)
             with col1:
-                st.plotly_chart(fig1)
+                st.plotly_chart(cached_figure('rmse_bars', [metrics_df], None, build_rmse_bars))
             with col2:
-                st.plotly_chart(fig2)
+                st.plotly_chart(cached_figure('r2_bars', [metrics_df], None, build_r2_bars))
                 
         except Exception as e:
             st.error(f"Error creating model comparison visualization: {str(e)}")
@@ -1447,60 +2100,15 @@ def results_visualization_step():
             model_type = list(st.session_state.pipeline['models'].keys())[0]
             model = st.session_state.pipeline['models'][model_type]
             
-            st.write("Adjust the feature values to see how they affect the prediction:")
-            
-            input_features = {}
-            for feature in features:
-                min_val = float(df[feature].min())
-                max_val = float(df[feature].max())
-                mean_val = float(df[feature].mean())
-                
-                input_features[feature] = st.slider(
-                    f"{feature}", 
-                    min_value=min_val,
-                    max_value=max_val,
-                    value=mean_val,
-                    step=(max_val - min_val) / 100
-                )
-            
-            input_df = pd.DataFrame([input_features])
-            prediction = model.predict(input_df)[0]
-            
-            st.subheader("Prediction Result")
-            st.metric("Predicted Value", f"{prediction:.2f}")
-            
-            # Create a radar chart for input features
-            radar_df = pd.DataFrame({
-                'Feature': list(input_features.keys()),
-                'Value': list(input_features.values()),
-                'Min': [float(df[feat].min()) for feat in input_features.keys()],
-                'Max': [float(df[feat].max()) for feat in input_features.keys()]
-            })
-            
-            # Normalize values for radar chart
-            radar_df['NormalizedValue'] = (radar_df['Value'] - radar_df['Min']) / (radar_df['Max'] - radar_df['Min'])
-            
-            fig = go.Figure()
-            fig.add_trace(go.Scatterpolar(
-                r=radar_df['NormalizedValue'],
-                theta=radar_df['Feature'],
-                fill='toself',
-                name='Feature Values'
-            ))
-            
-            fig.update_layout(
-                polar=dict(
-                    radialaxis=dict(
-                        visible=True,
-                        range=[0, 1]
-                    )
-                ),
-                title="Feature Values (Normalized)",
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font_color='#e0e0e0'
-            )
-            st.plotly_chart(fig)
+            # Compiled once per trained model / feature set, not on every slider move
+            cache = st.session_state.stage_cache
+            _, predictor = cache.run('predictor', [stage_keys['train'][model_type]], {'features': features},
+                                     lambda: CompiledPredictor(model, features))
+            _, bounds = cache.run('feature_bounds', [stage_keys['features']], {'features': features},
+                                  lambda: feature_bounds(df, features))
+            _, sample = cache.run('pd_sample', [stage_keys['features']], {'features': features},
+                                  lambda: sample_rows(df, features))
+            interactive_prediction(predictor, bounds, sample, stage_keys['train'][model_type])
             
         except Exception as e:
             st.error(f"Error in interactive prediction: {str(e)}")
@@ -1519,18 +2127,20 @@ def results_visualization_step():
             'model_trained': False,
             'model_evaluated': False,
             'results_visualized': False,
-            'df': None,
-            'df_processed': None,
+            'frames': None,
+            'stage_keys': {},
             'target': None,
             'features': None,
-            'X_train': None,
-            'X_test': None,
-            'y_train': None,
-            'y_test': None,
             'models': {},
             'y_preds': {},
             'current_price': None,
             'last_symbol': None,
+            'from_store': False,
+            'fetch_report': None,
+            'cleaning_report': None,
+            'cv_folds': None,
+            'fit_seconds': {},
+            'scaler': None,
         }
         st.session_state.theme = current_theme
         st.rerun()
@@ -1548,6 +2158,9 @@ def main():
         # Add theme selector
         theme_selector()
         
+        st.checkbox("Compact dtypes (float32, small ints, categoricals)", key="compact_dtypes",
+                    help="Applied when data is loaded; roughly halves memory per stored frame.")
+        
         # Navigation buttons
         steps = [
             "Welcome",
@@ -1573,8 +2186,12 @@ def main():
         with st.expander("Pipeline State"):
             st.json({
                 k: v for k, v in st.session_state.pipeline.items() 
-                if k not in ['df', 'df_processed', 'X_train', 'X_test', 'y_train', 'y_test', 'models', 'y_preds', 'df_features']
+                if k not in ['frames', 'stage_keys', 'models', 'y_preds', 'fetch_report', 'cleaning_report', 'cv_folds', 'scaler']
             })
+            memory_report = pipeline_memory_report(st.session_state.pipeline)
+            if not memory_report.empty:
+                st.write(f"Memory: {memory_report['Memory (MB)'].sum():.2f} MB")
+                st.dataframe(memory_report.style.format({'Memory (MB)': '{:.2f}'}), hide_index=True)
     
     # Display the current step
     if st.session_state.pipeline['current_step'] == 0:
@@ -0,0 +1 @@
+# Streamlit-free building blocks used by the Stock ML Pipeline app (app.py)
@@ -0,0 +1,3 @@
+from stock_ml.batch import main
+
+main()
@@ -0,0 +1,92 @@
+# On-disk store of fitted models. Each artifact holds the estimator together with the scaler
+# and the feature/target names it was trained with, under a key derived from the training data
+# fingerprint and the hyperparameters (the app uses its content-hashed 'train' stage key).
+# Artifacts are written uncompressed with joblib, so reloading memory-maps the fitted arrays
+# (coefficients, KNN training sets and trees) instead of reading and copying them.
+import datetime
+import json
+import os
+from pathlib import Path
+
+import joblib
+import sklearn
+
+ARTIFACT_DIR = Path(os.environ.get(
+    'STOCK_ML_ARTIFACT_DIR',
+    Path(__file__).resolve().parent.parent / 'data' / 'models'
+))
+
+
+class ModelArtifactStore:
+    # <root>/<key>.joblib holds the artifact and <root>/<key>.json its metadata
+    def __init__(self, root=ARTIFACT_DIR):
+        self.root = Path(root)
+
+    def _artifact_path(self, key):
+        return self.root / f"{key}.joblib"
+
+    def _metadata_path(self, key):
+        return self.root / f"{key}.json"
+
+    def metadata(self, key):
+        path = self._metadata_path(key)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def __contains__(self, key):
+        metadata = self.metadata(key)
+        return (
+            metadata is not None
+            and metadata.get('sklearn_version') == sklearn.__version__
+            and self._artifact_path(key).exists()
+        )
+
+    def save(self, key, model, features, target, scaler=None, **metadata):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._artifact_path(key).with_suffix('.joblib.tmp')
+        joblib.dump({'model': model, 'scaler': scaler, 'features': list(features), 'target': target}, tmp_path)
+        os.replace(tmp_path, self._artifact_path(key))
+
+        metadata = {
+            'key': key,
+            'estimator': type(model).__name__,
+            'features': list(features),
+            'target': target,
+            'scaled': scaler is not None,
+            'sklearn_version': sklearn.__version__,
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            **metadata,
+        }
+        tmp_path = self._metadata_path(key).with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(metadata, f, default=str)
+        os.replace(tmp_path, self._metadata_path(key))
+
+    # Returns {'model', 'scaler', 'features', 'target'} or None. Artifacts written by another
+    # scikit-learn version, or for a different target or feature list than requested, are
+    # ignored rather than unpickled.
+    def load(self, key, target=None, features=None):
+        if key not in self:
+            return None
+        metadata = self.metadata(key)
+        if target is not None and metadata.get('target') != target:
+            return None
+        if features is not None and metadata.get('features') != list(features):
+            return None
+        return joblib.load(self._artifact_path(key), mmap_mode='r')
+
+    # Metadata of every stored artifact, newest first
+    def list(self):
+        if not self.root.exists():
+            return []
+        entries = []
+        for path in self.root.glob('*.json'):
+            with open(path) as f:
+                entries.append(json.load(f))
+        return sorted(entries, key=lambda entry: entry.get('created', ''), reverse=True)
+
+    def delete(self, key):
+        self._artifact_path(key).unlink(missing_ok=True)
+        self._metadata_path(key).unlink(missing_ok=True)
@@ -0,0 +1,122 @@
+# Headless batch runner: runs many pipeline configurations in parallel on a process pool and
+# writes metrics and predictions to disk.
+#
+#   python -m stock_ml runs.json --output results/ --workers 4
+#
+# runs.json holds {"defaults": {...}, "runs": [{...}, ...]}; every run is merged over the
+# defaults, and a run with a "symbols" list expands into one run per symbol. See
+# stock_ml.engine.run_pipeline for the configuration keys.
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from stock_ml.data_store import OHLCVStore, download_yfinance_bars
+from stock_ml.engine import run_pipeline, stored_indicators
+from stock_ml.stages import fingerprint
+from stock_ml.universe import load_universe
+
+
+# Expand a batch configuration into a flat list of single-run configurations with run ids
+def expand_runs(batch):
+    if isinstance(batch, list):
+        batch = {'runs': batch}
+    defaults = batch.get('defaults', {})
+    runs = []
+    for run in batch.get('runs', [{}]):
+        config = {**defaults, **run}
+        symbols = config.pop('symbols', None)
+        for symbol in symbols or [config.get('symbol')]:
+            single = dict(config, symbol=symbol) if symbol else dict(config)
+            name = symbol or Path(single.get('path', 'data')).stem
+            single['run_id'] = f"{len(runs):04d}_{name}_{fingerprint(sorted(single.items()))[:8]}"
+            runs.append(single)
+    return runs
+
+
+# Fetch function for workers after a prefetch: never download, so only the parent writes bars
+def _stored_only(symbol, start, end):
+    return None
+
+
+# Worker entry point: run one configuration, never raising so the batch keeps going
+def _run_one(config, fetch=download_yfinance_bars):
+    started = time.perf_counter()
+    try:
+        metrics, predictions = run_pipeline(config, fetch=fetch)
+        error = None
+    except Exception as e:
+        metrics, predictions, error = pd.DataFrame([{'Error': str(e)}]), None, str(e)
+    metrics.insert(0, 'Run', config['run_id'])
+    metrics.insert(1, 'Symbol', config.get('symbol'))
+    metrics['Run (s)'] = time.perf_counter() - started
+    return config['run_id'], metrics, predictions, error
+
+
+# Download every symbol once (for the widest requested range) and bring every run's indicators
+# up to date before the workers start. Workers then load with _stored_only, so a range the
+# store cannot mark covered (today's session) is not downloaded again by every worker; any
+# remaining writes go through per-process temporary files.
+def prefetch_symbols(runs, max_workers=8):
+    ranges = {}
+    for config in runs:
+        symbol = config.get('symbol')
+        if symbol and 'path' not in config:
+            start, end = ranges.get(symbol, (config['start'], config['end']))
+            ranges[symbol] = (min(start, config['start']), max(end, config['end']))
+    by_range = {}
+    for symbol, symbol_range in ranges.items():
+        by_range.setdefault(symbol_range, []).append(symbol)
+    store = OHLCVStore()
+    for (start, end), symbols in by_range.items():
+        load_universe(symbols, start, end,
+                      lambda symbol, s, e: store.load(symbol, s, e, download_yfinance_bars),
+                      max_workers=max_workers)
+    for config in runs:
+        if config.get('symbol') and 'path' not in config and config.get('indicators'):
+            bars = store.load(config['symbol'], config['start'], config['end'], lambda *args: None)
+            if not bars.empty:
+                stored_indicators(config['symbol'], bars['Date'], config['indicators'], store)
+
+
+# Run a batch and write <output>/metrics.csv and <output>/predictions/<run id>.csv
+def run_batch(batch, output_dir, workers=None, prefetch=True):
+    runs = expand_runs(batch)
+    output_dir = Path(output_dir)
+    (output_dir / 'predictions').mkdir(parents=True, exist_ok=True)
+    if prefetch:
+        prefetch_symbols(runs)
+
+    all_metrics = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        fetch = _stored_only if prefetch else download_yfinance_bars
+        futures = [pool.submit(_run_one, config, fetch) for config in runs]
+        for future in as_completed(futures):
+            run_id, metrics, predictions, error = future.result()
+            all_metrics.append(metrics)
+            if predictions is not None:
+                predictions.to_csv(output_dir / 'predictions' / f"{run_id}.csv", index=False)
+            print(f"{run_id}: {'failed: ' + error if error else 'ok'}")
+
+    metrics = pd.concat(all_metrics, ignore_index=True).sort_values('Run', kind='stable')
+    metrics.to_csv(output_dir / 'metrics.csv', index=False)
+    with open(output_dir / 'runs.json', 'w') as f:
+        json.dump(runs, f, indent=2, default=str)
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m stock_ml', description="Run Stock ML Pipeline configurations headlessly.")
+    parser.add_argument('config', help="JSON file with {\"defaults\": {...}, \"runs\": [...]}")
+    parser.add_argument('--output', default='results', help="Directory for metrics.csv and predictions/")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--no-prefetch', action='store_true', help="Let workers download their own data")
+    args = parser.parse_args(argv)
+
+    with open(args.config) as f:
+        batch = json.load(f)
+    metrics = run_batch(batch, args.output, workers=args.workers, prefetch=not args.no_prefetch)
+    print(metrics.to_string(index=False))
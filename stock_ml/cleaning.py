@@ -0,0 +1,141 @@
+# Vectorized numeric cleaning of uploaded data with sampled dtype inference
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Placeholders treated as missing values rather than as unparseable text
+NULL_TOKENS = ['', '-', '--', 'n/a', 'N/A', 'na', 'NA', 'nan', 'NaN', 'none', 'None', 'null', 'NULL']
+
+_STRIP_CHARS = ['$', '€', '£', '¥', ',', '%', '(', ')', '+', ' ']
+_NUMBER_PATTERN = r'^-?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$'
+_ACCOUNTING_NEGATIVE_PATTERN = r'^\s*\(.*\)\s*$'
+# Whole name tokens only, so e.g. 'Trade_Date' matches but 'Updated' or 'Lifetime_value' do not
+_DATE_NAME_PATTERN = re.compile(r'(^|[_\W])(date|time|datetime|timestamp)($|[_\W])', re.IGNORECASE)
+
+
+# Helper function to check whether a column holds text (object or pandas string dtype)
+def _is_text_column(series):
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+# Helper function to view a pandas column as an Arrow string array
+def _to_arrow_strings(series):
+    try:
+        return pa.array(series, type=pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed python objects (e.g. ints and strings) need an explicit str cast first
+        return pa.array(series.astype(str).where(series.notna()), type=pa.string(), from_pandas=True)
+
+
+# Strip currency symbols, thousands separators, percent signs and accounting parentheses,
+# returning (numbers, unparsed, missing) Arrow arrays for the given strings. Only the characters
+# in `strip_chars` are replaced (all of them when None), and a plain cast is tried before the
+# regex validation, so clean columns never touch a regex kernel.
+def _parse_numbers(strings, strip_chars=None):
+    values = strings
+    for char in _STRIP_CHARS if strip_chars is None else strip_chars:
+        values = pc.replace_substring(values, char, '')
+
+    try:
+        numbers = pc.cast(values, pa.float64())
+        missing = pc.is_null(values)
+        unparsed = pa.repeat(pa.scalar(False), len(values))
+    except pa.ArrowInvalid:
+        if strip_chars is not None:
+            # A character absent from the sample shows up further down the column
+            return _parse_numbers(strings)
+        values = pc.utf8_trim_whitespace(values)
+        parsed = pc.fill_null(pc.match_substring_regex(values, _NUMBER_PATTERN), False)
+        numbers = pc.cast(pc.if_else(parsed, values, pa.scalar(None, pa.string())), pa.float64())
+        missing = pc.fill_null(pc.is_in(values, value_set=pa.array(NULL_TOKENS)), True)
+        unparsed = pc.invert(pc.or_(parsed, missing))
+
+    if strip_chars is None or '(' in strip_chars:
+        negative = pc.fill_null(pc.match_substring_regex(strings, _ACCOUNTING_NEGATIVE_PATTERN), False)
+        numbers = pc.if_else(negative, pc.negate(numbers), numbers)
+    return numbers, unparsed, missing
+
+
+# Helper function to guess whether sampled text values are dates
+def _looks_like_dates(sample):
+    if sample.empty:
+        return False
+    with warnings.catch_warnings():
+        # Free text makes pandas warn that no single date format could be inferred
+        warnings.simplefilter('ignore', UserWarning)
+        parsed = pd.to_datetime(sample, errors='coerce')
+    return parsed.notna().mean() >= 0.9
+
+
+# Decide which text columns hold numbers.
+# Each text column is classified from a random sample of at most `sample_size` rows: it is
+# numeric when at least `threshold` of its non-missing sampled values parse as numbers.
+# Returns {column: (action, strip_chars)} where action is 'converted', 'kept (date)' or
+# 'kept (text)' and strip_chars lists the symbols/separators seen in the sample.
+def infer_numeric_plan(df, sample_size=1000, threshold=0.95, random_state=0):
+    text_columns = [col for col in df.columns if _is_text_column(df[col])]
+    plan = {}
+    if not text_columns or df.empty:
+        return plan
+
+    rng = np.random.default_rng(random_state)
+    rows = rng.choice(len(df), size=min(sample_size, len(df)), replace=False)
+    sample = df.iloc[np.sort(rows)]
+
+    for col in text_columns:
+        if _DATE_NAME_PATTERN.search(str(col)):
+            plan[col] = ('kept (date)', None)
+            continue
+        _, unparsed, missing = _parse_numbers(_to_arrow_strings(sample[col]))
+        present = len(missing) - pc.sum(missing).as_py()
+        if present and 1 - pc.sum(unparsed).as_py() / present >= threshold:
+            seen = set(''.join(sample[col].dropna().astype(str)))
+            plan[col] = ('converted', [char for char in _STRIP_CHARS if char in seen])
+        elif _looks_like_dates(sample[col].dropna().head(50)):
+            plan[col] = ('kept (date)', None)
+        else:
+            plan[col] = ('kept (text)', None)
+    return plan
+
+
+# Convert the columns a plan marks as numeric with vectorized Arrow kernels (no per-value
+# Python); values that still do not parse become NaN. Returns (df, {column: unparsed count}).
+def apply_numeric_plan(df, plan):
+    unparsed_counts = {}
+    converted = [(col, strip_chars) for col, (action, strip_chars) in plan.items()
+                 if action == 'converted' and col in df.columns and _is_text_column(df[col])]
+    if not converted:
+        return df, unparsed_counts
+
+    # Shallow copy: converted columns are replaced, never written in place
+    df = df.copy(deep=False)
+    for col, strip_chars in converted:
+        numbers, unparsed, _ = _parse_numbers(_to_arrow_strings(df[col]), strip_chars)
+        values = numbers.to_numpy(zero_copy_only=False)
+        # Whole numbers become int64 only when every value fits (no NaN, inf or huge values)
+        if (np.abs(values) < 2.0 ** 63).all() and np.array_equal(values, np.floor(values)):
+            values = values.astype(np.int64)
+        df[col] = values
+        unparsed_counts[col] = pc.sum(unparsed).as_py() or 0
+    return df, unparsed_counts
+
+
+# Helper function to turn a plan and its unparsed counts into a report frame
+def cleaning_report(plan, unparsed_counts):
+    return pd.DataFrame(
+        [{'Column': col, 'Action': action, 'Unparsed': unparsed_counts.get(col, 0)}
+         for col, (action, _) in plan.items()],
+        columns=['Column', 'Action', 'Unparsed']
+    )
+
+
+# Convert numeric-looking text columns to numbers, leaving date columns and free text untouched.
+# Returns (df, report) where report lists the action taken for every text column.
+def clean_numeric_columns(df, sample_size=1000, threshold=0.95, random_state=0):
+    plan = infer_numeric_plan(df, sample_size, threshold, random_state)
+    df, unparsed_counts = apply_numeric_plan(df, plan)
+    return df, cleaning_report(plan, unparsed_counts)
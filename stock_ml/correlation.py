@@ -0,0 +1,135 @@
+# Correlation engine for wide feature sets.
+# Every column is standardized once and kept; the correlation matrix is then Z'Z / (n - 1), a
+# single matrix product (optionally in float32). Adding a column to the selection only costs
+# one matrix-vector product against the columns already there, and removing one just drops
+# its row and column, so toggling features in the UI never recomputes the whole matrix.
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import leaves_list, linkage
+from scipy.spatial.distance import squareform
+
+HEATMAP_TEXT_LIMIT = 20
+HEATMAP_MAX_SIZE = 120
+
+
+# Helper function to center and scale a column to unit sample variance. Missing values are
+# mean-filled; a constant column stays all zeros and gets NaN correlations.
+def _standardize(values, dtype):
+    values = np.asarray(values, dtype=np.float64)
+    mean = np.nanmean(values) if len(values) else 0.0
+    centered = np.where(np.isnan(values), 0.0, values - mean)
+    std = np.sqrt((centered ** 2).sum() / max(len(values) - 1, 1))
+    if std > 0:
+        centered /= std
+    return centered.astype(dtype, copy=False), std > 0
+
+
+class CorrelationEngine:
+    def __init__(self, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.names = []
+        self._columns = {}
+        self._valid = {}
+        self._matrix = np.empty((0, 0), dtype=self.dtype)
+        self.stats = {'added': 0, 'removed': 0}
+
+    # Make the selection equal to `names`; get_column(name) is only called for new names
+    def update(self, names, get_column):
+        names = list(dict.fromkeys(names))
+        keep = [i for i, name in enumerate(self.names) if name in names]
+        removed = len(self.names) - len(keep)
+        if removed:
+            self._matrix = self._matrix[np.ix_(keep, keep)]
+            self.names = [self.names[i] for i in keep]
+            self.stats['removed'] += removed
+
+        added = [name for name in names if name not in self.names]
+        for name in added:
+            if name not in self._columns:
+                self._columns[name], self._valid[name] = _standardize(get_column(name), self.dtype)
+        if added:
+            self._add(added)
+
+    # New rows/columns: one product of the new block with itself, and one matrix-vector
+    # product per existing column, so the existing block is never recomputed or copied
+    def _add(self, added):
+        new = np.column_stack([self._columns[name] for name in added])
+        scale = 1.0 / (len(new) - 1) if len(new) > 1 else np.nan
+        size = len(self.names)
+        matrix = np.empty((size + len(added), size + len(added)), dtype=self.dtype)
+        matrix[:size, :size] = self._matrix
+        for i, name in enumerate(self.names):
+            matrix[i, size:] = (self._columns[name] @ new) * scale
+        matrix[size:, :size] = matrix[:size, size:].T
+        matrix[size:, size:] = (new.T @ new) * scale
+        self._matrix = matrix
+        self.names.extend(added)
+        self.stats['added'] += len(added)
+
+    # Correlation matrix of the current selection in selection order (or in the given order)
+    def matrix(self, order=None):
+        corr = self._matrix.astype(np.float64)
+        invalid = [i for i, name in enumerate(self.names) if not self._valid[name]]
+        corr[invalid, :] = np.nan
+        corr[:, invalid] = np.nan
+        np.clip(corr, -1.0, 1.0, out=corr)
+        frame = pd.DataFrame(corr, index=self.names, columns=self.names)
+        if order is not None:
+            frame = frame.loc[order, order]
+        return frame
+
+
+# Full correlation matrix of a DataFrame in one matrix product (same result as df.corr() for
+# data without missing values)
+def correlation_matrix(df, dtype=np.float64):
+    engine = CorrelationEngine(dtype)
+    engine.update(df.columns, lambda name: df[name])
+    return engine.matrix()
+
+
+# Hierarchical clustering order of a correlation matrix (average linkage on 1 - |r|), so
+# strongly related features end up next to each other
+def cluster_order(corr):
+    if len(corr) < 3:
+        return list(corr.index)
+    distance = 1.0 - np.abs(np.nan_to_num(corr.to_numpy(), nan=0.0))
+    np.fill_diagonal(distance, 0.0)
+    distance = np.clip((distance + distance.T) / 2.0, 0.0, None)
+    order = leaves_list(linkage(squareform(distance, checks=False), method='average'))
+    return [corr.index[i] for i in order]
+
+
+# The k features most correlated with the target (by absolute value)
+def top_correlations(corr, target, k=10):
+    values = corr[target].drop(target).dropna()
+    top = values.reindex(values.abs().sort_values(ascending=False).index[:k])
+    return pd.DataFrame({'Feature': top.index, 'Correlation': top.to_numpy(), '|r|': np.abs(top.to_numpy())})
+
+
+# Prepare a correlation matrix for display: hide |r| below `threshold` (off the diagonal) and,
+# above `max_size` columns, downsample by blocks of neighbouring features (use a clustered
+# order so blocks are related features), keeping the strongest correlation of each block.
+def heatmap_matrix(corr, threshold=0.0, max_size=HEATMAP_MAX_SIZE):
+    values = corr.to_numpy(copy=True)
+    if threshold > 0:
+        off_diagonal = ~np.eye(len(values), dtype=bool)
+        values[off_diagonal & (np.abs(values) < threshold)] = np.nan
+    labels = list(corr.index)
+    if len(labels) <= max_size:
+        return pd.DataFrame(values, index=labels, columns=labels)
+
+    block = int(np.ceil(len(labels) / max_size))
+    starts = np.arange(0, len(labels), block)
+    ends = np.minimum(starts + block, len(labels))
+    block_labels = [labels[s] if e - s == 1 else f"{labels[s]} … {labels[e - 1]}" for s, e in zip(starts, ends)]
+
+    # Keep the signed value with the largest magnitude in every block (NaN if the block is empty)
+    size = len(starts) * block
+    padded = np.full((size, size), np.nan)
+    padded[:len(labels), :len(labels)] = values
+    cells = padded.reshape(len(starts), block, len(starts), block).transpose(0, 2, 1, 3).reshape(len(starts), len(starts), -1)
+    magnitude = np.where(np.isnan(cells), -1.0, np.abs(cells))
+    strongest_cell = magnitude.argmax(axis=2)[..., None]
+    strongest = np.take_along_axis(cells, strongest_cell, axis=2)[..., 0]
+    strongest[np.take_along_axis(magnitude, strongest_cell, axis=2)[..., 0] < 0] = np.nan
+    return pd.DataFrame(strongest, index=block_labels, columns=block_labels)
@@ -0,0 +1,162 @@
+# Persistent on-disk OHLCV store (one Parquet file per symbol) with incremental range fill
+import datetime
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+import yfinance as yf
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_message
+
+OHLCV_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+DATA_STORE_DIR = Path(os.environ.get(
+    'STOCK_ML_DATA_DIR',
+    Path(__file__).resolve().parent.parent / 'data' / 'ohlcv'
+))
+
+
+# Temporary file next to path, unique per process and thread so concurrent writers never share it
+def _tmp_path(path):
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+# Helper function to download raw bars from Yahoo Finance, retrying when rate limited
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=4, max=10),
+    retry=retry_if_exception_message(match='Too Many Requests')
+)
+def download_yfinance_bars(symbol, start, end):
+    df = yf.Ticker(symbol).history(start=start, end=end)
+    if df.empty:
+        return None
+    df = df.reset_index()
+    return df[OHLCV_COLUMNS]
+
+
+# Helper function to turn a date-like value into a naive midnight timestamp
+def _to_day(value):
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.normalize()
+
+
+# Helper function to get wall-clock dates of a (possibly tz-aware) Date column
+def _naive_dates(dates):
+    dates = pd.to_datetime(dates)
+    if getattr(dates.dt, 'tz', None) is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates
+
+
+# Helper function to merge overlapping or touching [start, end) intervals
+def _merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class OHLCVStore:
+    # Bars are kept per symbol in <root>/<SYMBOL>.parquet, and the date ranges that have
+    # already been downloaded in <root>/<SYMBOL>.json. Ranges are half-open [start, end) like
+    # yfinance's history(start, end). A requested range counts as covered (up to today) only
+    # when the provider returned bars for it, so an empty response (yfinance's answer to
+    # throttling and transient errors) never blocks a range from being downloaded again, while
+    # weekends and holidays inside or at the end of a successful download are never re-fetched.
+    def __init__(self, root=DATA_STORE_DIR):
+        self.root = Path(root)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # One lock per symbol, so different symbols can be filled concurrently
+    def _symbol_lock(self, symbol):
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _bars_path(self, symbol):
+        return self.root / f"{symbol.upper()}.parquet"
+
+    def _coverage_path(self, symbol):
+        return self.root / f"{symbol.upper()}.json"
+
+    def read(self, symbol):
+        path = self._bars_path(symbol)
+        if not path.exists():
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        return pd.read_parquet(path)
+
+    def coverage(self, symbol):
+        path = self._coverage_path(symbol)
+        if not path.exists():
+            return []
+        with open(path) as f:
+            return [[_to_day(start), _to_day(end)] for start, end in json.load(f)]
+
+    # Date ranges inside [start, end) that are not yet in the store
+    def missing_ranges(self, symbol, start, end):
+        start, end = _to_day(start), _to_day(end)
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in self.coverage(symbol):
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    # Merge new bars into the stored history, newest download wins on duplicate dates
+    def write(self, symbol, new_bars, covered):
+        self.root.mkdir(parents=True, exist_ok=True)
+        bars = self.read(symbol)
+        if new_bars is not None and not new_bars.empty:
+            new_bars = new_bars[OHLCV_COLUMNS]
+            bars = new_bars if bars.empty else pd.concat([bars, new_bars], ignore_index=True)
+            bars = bars.drop_duplicates(subset='Date', keep='last').sort_values('Date').reset_index(drop=True)
+            tmp_path = _tmp_path(self._bars_path(symbol))
+            bars.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, self._bars_path(symbol))
+
+        # Today's session may still be in progress, so never mark it as covered
+        today = _to_day(datetime.date.today())
+        intervals = self.coverage(symbol)
+        intervals += [[start, min(end, today)] for start, end in covered if start < min(end, today)]
+        tmp_path = _tmp_path(self._coverage_path(symbol))
+        with open(tmp_path, 'w') as f:
+            json.dump([[s.strftime('%Y-%m-%d'), e.strftime('%Y-%m-%d')] for s, e in _merge_intervals(intervals)], f)
+        os.replace(tmp_path, self._coverage_path(symbol))
+        return bars
+
+    # Return bars for [start, end), downloading only the gaps through fetch(symbol, start, end)
+    def load(self, symbol, start, end, fetch):
+        symbol = symbol.upper()
+        with self._symbol_lock(symbol):
+            gaps = self.missing_ranges(symbol, start, end)
+            if gaps:
+                downloaded, covered = [], []
+                for gap_start, gap_end in gaps:
+                    bars = fetch(symbol, gap_start.strftime('%Y-%m-%d'), gap_end.strftime('%Y-%m-%d'))
+                    if bars is not None and not bars.empty:
+                        downloaded.append(bars)
+                        covered.append((gap_start, gap_end))
+                new_bars = pd.concat(downloaded, ignore_index=True) if downloaded else None
+                bars = self.write(symbol, new_bars, covered) if downloaded else self.read(symbol)
+            else:
+                bars = self.read(symbol)
+
+        if bars.empty:
+            return bars
+        dates = _naive_dates(bars['Date'])
+        mask = (dates >= _to_day(start)) & (dates < _to_day(end))
+        return bars.loc[mask].reset_index(drop=True)
@@ -0,0 +1,109 @@
+# Shape-preserving downsampling for long charts.
+# A chart never needs more points than it has pixels, so long series are reduced to a point
+# budget before they are sent to the browser: Largest-Triangle-Three-Buckets keeps the points
+# that carry the visual shape of a line, min/max buckets keep every bucket's extremes (cheaper,
+# fully vectorized, and nothing spiky is lost). Functions return row positions, so the caller
+# indexes its own x/y (dates stay dates). A zoom window re-downsamples only the visible rows.
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+POINT_BUDGET = 2000
+WEBGL_MIN_POINTS = 5000
+DOWNSAMPLE_METHODS = ["LTTB", "Min/Max"]
+
+
+# Helper function to check whether x values are dates (naive or tz-aware)
+def _is_dates(x):
+    dtype = getattr(x, 'dtype', None)
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return True
+    x = np.asarray(x)
+    return np.issubdtype(x.dtype, np.datetime64) or x.dtype == object
+
+
+# Helper function to turn x values (numbers or dates) into floats for distance math. Tz-aware
+# dates are taken at their wall-clock time, as the chart shows them.
+def _numeric(x):
+    if _is_dates(x):
+        dates = pd.DatetimeIndex(pd.to_datetime(x))
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+        return dates.as_unit('ns').asi8.astype(np.float64)
+    return np.asarray(x, dtype=np.float64)
+
+
+# Positions of the smallest and largest value in each of `n_buckets` equal-size buckets,
+# plus the first and last point, in order
+def minmax_indices(y, n_buckets):
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    width = int(np.ceil(n / n_buckets))
+    padded = np.concatenate((y, np.full(width * n_buckets - n, np.nan))).reshape(n_buckets, width)
+    offsets = np.arange(n_buckets) * width
+    lows = np.where(np.isnan(padded), np.inf, padded).argmin(axis=1) + offsets
+    highs = np.where(np.isnan(padded), -np.inf, padded).argmax(axis=1) + offsets
+    return np.unique(np.clip(np.concatenate(([0, n - 1], lows, highs)), 0, n - 1))
+
+
+# Largest-Triangle-Three-Buckets: the first and last points plus, for every bucket in between,
+# the point forming the largest triangle with the point picked in the previous bucket and the
+# average of the next bucket
+def lttb_indices(x, y, n_out):
+    x = _numeric(x)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Averages of every bucket from prefix sums (the last bucket's "next" is the last point)
+    x_sum = np.r_[0.0, np.cumsum(x)]
+    y_sum = np.r_[0.0, np.cumsum(y)]
+    sizes = np.maximum(edges[1:] - edges[:-1], 1)
+    x_avg = np.r_[(x_sum[edges[1:]] - x_sum[edges[:-1]]) / sizes, x[-1]]
+    y_avg = np.r_[(y_sum[edges[1:]] - y_sum[edges[:-1]]) / sizes, y[-1]]
+
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        lo, hi = edges[bucket], max(edges[bucket + 1], edges[bucket] + 1)
+        ax, ay = x[previous], y[previous]
+        bx, by = x_avg[bucket + 1], y_avg[bucket + 1]
+        area = np.abs((ax - bx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (by - ay))
+        previous = lo + int(area.argmax())
+        picked[bucket + 1] = previous
+    return np.unique(picked)
+
+
+# Row positions to plot for a series: rows are taken in x order, restricted to the zoom
+# `window` ((start, end) in x units, None for everything) and reduced to at most about
+# `budget` points. Returns (positions, number of rows in the window).
+def downsample_series(x, y, budget=POINT_BUDGET, window=None, method="LTTB"):
+    x_numeric = _numeric(x)
+    order = np.arange(len(x_numeric))
+    if len(x_numeric) > 1 and not (np.diff(x_numeric) >= 0).all():
+        order = np.argsort(x_numeric, kind='stable')
+    if window is not None:
+        # Bounds come in x units; for dates they may be strings (e.g. from a chart selection)
+        if _is_dates(x):
+            start, end = (float(pd.Timestamp(bound).as_unit('ns').value) for bound in window)
+        else:
+            start, end = float(window[0]), float(window[1])
+        sorted_x = x_numeric[order]
+        order = order[np.searchsorted(sorted_x, start, side='left'):np.searchsorted(sorted_x, end, side='right')]
+    if len(order) <= budget:
+        return order, len(order)
+
+    y_window = np.asarray(y, dtype=np.float64)[order]
+    if method == "Min/Max":
+        picked = minmax_indices(y_window, max(budget // 2, 1))
+    else:
+        picked = lttb_indices(x_numeric[order], y_window, budget)
+    return order[picked], len(order)
+
+
+# Scatter trace class for a series of `n_points` raw points: WebGL above WEBGL_MIN_POINTS
+def scatter_trace(n_points, **kwargs):
+    return go.Scattergl(**kwargs) if n_points > WEBGL_MIN_POINTS else go.Scatter(**kwargs)
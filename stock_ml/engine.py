@@ -0,0 +1,359 @@
+# Plain-Python pipeline engine: load -> preprocess -> features -> split -> train -> evaluate.
+# The Streamlit steps in app.py and the batch runner (stock_ml.batch) both call these functions.
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from stock_ml.artifacts import ARTIFACT_DIR, ModelArtifactStore
+from stock_ml.cleaning import clean_numeric_columns
+from stock_ml.data_store import OHLCVStore, _naive_dates, download_yfinance_bars
+from stock_ml.incremental import IndicatorStore
+from stock_ml.indicators import compute_indicators
+from stock_ml.knn_index import DEFAULT_LEAF_SIZE, DEFAULT_N_PROBE, build_knn
+from stock_ml.lags import LagFeatures
+from stock_ml.lineage import FrameLineage
+from stock_ml.metrics import metrics_table
+from stock_ml.online import OnlineLinearRegression
+from stock_ml.stages import fingerprint
+from stock_ml.validation import walk_forward_folds, walk_forward_cv
+
+MODEL_TYPES = ["Linear Regression", "Logistic Regression", "K-Nearest Neighbors"]
+
+
+# Helper function to check if a series is continuous or categorical
+def is_continuous(series):
+    if pd.api.types.is_numeric_dtype(series):
+        unique_values = len(series.unique())
+        return unique_values > 10
+    return False
+
+
+# Load one symbol through the on-disk OHLCV store, or a CSV/Excel file from disk
+def load_data(symbol=None, start=None, end=None, path=None, store=None, fetch=download_yfinance_bars):
+    if path is not None:
+        df = pd.read_excel(path) if str(path).endswith('.xlsx') else pd.read_csv(path)
+        df, _ = clean_numeric_columns(df)
+        return df
+    store = store or OHLCVStore()
+    return store.load(symbol, start, end, fetch)
+
+
+# Stored bars a symbol's indicators are computed over: from the first requested date to the end
+# of the contiguous covered range holding the requested rows (a range reaching today stays open),
+# so warm-up never reaches back before the request or across a gap to other loaded ranges and
+# the values match compute_indicators() on the loaded rows. None when the requested rows are not
+# all inside one covered range.
+def _indicator_bars(store, symbol, first, last):
+    today = pd.Timestamp(datetime.date.today())
+    for covered_start, covered_end in store.coverage(symbol):
+        if covered_start <= first and (last < covered_end or covered_end >= today):
+            bars = store.read(symbol)
+            dates = _naive_dates(bars['Date'])
+            keep = (dates >= first) if covered_end >= today else (dates >= first) & (dates < covered_end)
+            return bars.loc[keep].reset_index(drop=True)
+    return None
+
+
+# Indicator values for rows loaded from the OHLCV store, refreshed incrementally: every symbol's
+# values and indicator state are kept next to its bars, so only bars appended since the last
+# refresh are processed. `symbols` is one symbol or a per-row Symbol column; rows are matched by
+# symbol and date. Returns None when some rows cannot be served from one contiguous stored
+# range, so the caller can compute from the frame instead.
+def stored_indicators(symbols, dates, indicators, store=None, indicator_store=None):
+    store = store or OHLCVStore()
+    indicator_store = indicator_store or IndicatorStore(store.root)
+    dates = _naive_dates(pd.Series(np.asarray(dates)))
+    if isinstance(symbols, str):
+        symbols = [symbols] * len(dates)
+    symbols = pd.Series(np.asarray(symbols, dtype=object)).str.upper()
+
+    stored = []
+    for symbol in symbols.unique():
+        symbol_dates = dates[symbols == symbol]
+        bars = _indicator_bars(store, symbol, symbol_dates.min().normalize(), symbol_dates.max())
+        if bars is None or bars.empty:
+            return None
+        values = indicator_store.refresh(symbol, bars, indicators)
+        values['Date'] = _naive_dates(values['Date'])
+        stored.append(values.set_index(pd.MultiIndex.from_arrays([[symbol] * len(values), values.pop('Date')])))
+    stored = pd.concat(stored)
+    rows = pd.MultiIndex.from_arrays([symbols, dates])
+    if not rows.isin(stored.index).all():
+        return None
+    return stored.reindex(rows)
+
+
+# Mean-impute missing numeric values. Returns (missing counts per column, imputed columns or None)
+def impute_missing(df):
+    missing_values = df.isnull().sum()
+    imputed = None
+    if missing_values.sum() > 0:
+        numeric_cols = [c for c in df.select_dtypes(include=np.number).columns if missing_values[c] > 0]
+        imputed = df[numeric_cols].fillna(df[numeric_cols].mean())
+    return missing_values, imputed
+
+
+# Moving average of Close (per symbol for panel data), back-filled with Close itself
+def moving_average(close, window, symbols=None):
+    if symbols is not None:
+        average = close.groupby(symbols, observed=True).transform(lambda s: s.rolling(window=window).mean())
+    else:
+        average = close.rolling(window=window).mean()
+    return average.fillna(close)
+
+
+# Standardize the given feature columns; returns (2-D array in column order, fitted scaler)
+def scale_features(df):
+    scaler = StandardScaler()
+    return scaler.fit_transform(df), scaler
+
+
+# Random train/test split of row positions (test_size in percent, as in the UI)
+def split_rows(n_rows, test_size=20, random_state=42):
+    return train_test_split(np.arange(n_rows), test_size=test_size / 100, random_state=random_state)
+
+
+# Build an unfitted estimator; KNN switches to a classifier for categorical targets
+# `online` makes Linear Regression an OnlineLinearRegression (same fit, plus partial_fit)
+def build_model(model_type, target_is_continuous=True, n_neighbors=5, knn_backend="Auto", leaf_size=DEFAULT_LEAF_SIZE, n_probe=DEFAULT_N_PROBE, online=False):
+    if model_type == "Linear Regression":
+        return OnlineLinearRegression() if online else LinearRegression()
+    if model_type == "Logistic Regression":
+        return LogisticRegression(max_iter=1000)
+    if model_type == "K-Nearest Neighbors":
+        return build_knn(n_neighbors, not target_is_continuous, knn_backend, leaf_size, n_probe)
+    raise ValueError(f"Unknown model type: {model_type}")
+
+
+# Helper function to check that a model type suits the target, returning an error message or None
+def model_mismatch(model_type, target_is_continuous):
+    if model_type == "Linear Regression" and not target_is_continuous:
+        return "Linear Regression expects a continuous target variable"
+    if model_type == "Logistic Regression" and target_is_continuous:
+        return "Logistic Regression expects a categorical target variable"
+    return None
+
+
+# Model types whose expectations match the target
+def applicable_models(target_is_continuous):
+    return [model_type for model_type in MODEL_TYPES if model_mismatch(model_type, target_is_continuous) is None]
+
+
+# Helper function to run fn(name, model) for every model on a thread pool (scikit-learn's
+# numeric kernels release the GIL) and time each call. Returns {name: (result, seconds)}.
+def _timed_concurrently(models, fn, max_workers=None):
+    def timed(item):
+        name, model = item
+        started = time.perf_counter()
+        result = fn(name, model)
+        return name, (result, time.perf_counter() - started)
+
+    if not models:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(models)) as pool:
+        return dict(pool.map(timed, models.items()))
+
+
+# Fit several unfitted models on the same data concurrently; returns {name: (model, fit seconds)}
+def fit_models(models, X_train, y_train, max_workers=None):
+    return _timed_concurrently(models, lambda name, model: model.fit(X_train, y_train), max_workers)
+
+
+# Bring the OnlineLinearRegression saved under `key` up to date with the training rows dated after
+# the last one it absorbed: only those rows go through partial_fit, and the model is saved back
+# under the same key with the new 'trained_through' date. Without a usable artifact the model is
+# fitted on all rows. Returns (model, number of rows absorbed).
+def update_online_model(artifact_store, key, X, y, dates, **metadata):
+    dates = _naive_dates(dates)
+    artifact = artifact_store.load(key, y.name, list(X.columns))
+    trained_through = artifact_store.metadata(key).get('trained_through') if artifact is not None else None
+    if trained_through is None or not isinstance(artifact['model'], OnlineLinearRegression):
+        model, new_rows = OnlineLinearRegression().fit(X, y), len(X)
+    else:
+        new = (dates > pd.Timestamp(trained_through)).to_numpy()
+        model, new_rows = artifact['model'].partial_fit(X[new], y[new]), int(new.sum())
+    if new_rows:
+        artifact_store.save(key, model, X.columns, y.name, trained_through=dates.max().isoformat(),
+                            rows_seen=model.n_samples_seen_, **metadata)
+    return model, new_rows
+
+
+# Predict with several fitted models concurrently; returns {name: (predictions, predict seconds)}
+def predict_models(models, X, max_workers=None):
+    return _timed_concurrently(models, lambda name, model: model.predict(X), max_workers)
+
+
+
+# Build the df_processed and df_features stages of a lineage the same way the UI does.
+# Returns the list of selectable numeric columns of the features stage.
+def engineer_features(frames, ma_window=20, features=None, scale=True, indicators=None, lags=None, indicator_values=None):
+    _, imputed = impute_missing(frames.base)
+    frames.set_stage('df_processed', 'df', imputed)
+
+    columns = frames.columns('df_processed')
+    engineered = pd.DataFrame(index=frames.index)
+    symbols = frames.column('df_processed', 'Symbol') if 'Symbol' in columns else None
+    if 'Close' in columns and ma_window:
+        engineered[f'MA_{ma_window}'] = moving_average(frames.column('df_processed', 'Close'), ma_window, symbols)
+    if indicator_values is not None:
+        engineered = pd.concat([engineered, indicator_values.set_axis(frames.index)], axis=1)
+    elif indicators:
+        processed = pd.DataFrame({c: frames.column('df_processed', c) for c in columns if c != 'Symbol'})
+        engineered = pd.concat([engineered, compute_indicators(processed, indicators, symbols)], axis=1)
+    if lags:
+        lag_features = LagFeatures(frames.column('df_processed', lags.get('column', 'Close')), lags['max_lag'],
+                                   lags.get('return_windows', ()), symbols)
+        for feature in features or []:
+            if feature in lag_features:
+                engineered[feature] = lag_features.feature(feature)
+    frames.set_stage('df_features', 'df_processed', engineered)
+
+    if scale and features:
+        scaled, _ = scale_features(frames.frame('df_features', columns=features))
+        for i, feature in enumerate(features):
+            engineered[feature] = scaled[:, i]
+        frames.set_stage('df_features', 'df_processed', engineered)
+
+    return [c for c in frames.columns('df_features') if pd.api.types.is_numeric_dtype(frames.column('df_features', c))]
+
+
+# Display name of every model spec: the model type, plus its parameters when several specs share
+# a type (e.g. a grid of KNN k values), plus a running number when whole specs repeat
+def model_labels(specs):
+    types = [spec['type'] for spec in specs]
+    labels = []
+    for spec in specs:
+        label = spec['type']
+        if types.count(label) > 1:
+            params = ', '.join(f"{name}={value}" for name, value in spec.items() if name != 'type')
+            label = f"{label} ({params})" if params else label
+        labels.append(label)
+    return [
+        f"{label} #{labels[:i + 1].count(label)}" if labels.count(label) > 1 else label
+        for i, label in enumerate(labels)
+    ]
+
+
+# Run the whole pipeline for one configuration.
+# config keys: symbol/start/end or path, target, features, ma_window, indicators (indicator
+# name -> windows, see stock_ml.indicators; kept up to date incrementally for symbols), lags ({"column", "max_lag", "return_windows"};
+# pick e.g. Close_lag_3 or Close_ret_5 in features), scale, test_size, random_state,
+# walk_forward ({"folds", "mode", "train_size", "gap", "n_jobs"}; replaces the random split and
+# adds CV columns to the metrics) and models (a list of {"type": ..., "n_neighbors": ...}; KNN
+# also takes "index" (see stock_ml.knn_index.KNN_INDEX_BACKENDS), "leaf_size" and "n_probe";
+# Linear Regression takes "online": true for the incremental least-squares model, and with
+# "update": true also keeps that model in the artifact store under artifact_dir and on later
+# runs only absorbs the training rows dated after the last run, see update_online_model; meant
+# for growing chronological data with "scale": false, since the scaler is refit on every run).
+# fetch(symbol, start, end) downloads the bars missing from the store (returning None keeps
+# the run on stored bars only).
+# Returns (metrics, predictions): one metrics row per model spec (named by model_labels) and the
+# test-set predictions.
+def run_pipeline(config, df=None, fetch=download_yfinance_bars):
+    store = None
+    if df is None:
+        store = OHLCVStore() if config.get('path') is None else None
+        df = load_data(config.get('symbol'), config.get('start'), config.get('end'), config.get('path'), store, fetch)
+    if df is None or df.empty:
+        raise ValueError("No data loaded")
+
+    indicators = config.get('indicators')
+    indicator_values = None
+    if indicators and store is not None:
+        indicator_values = stored_indicators(config['symbol'], df['Date'], indicators, store)
+
+    frames = FrameLineage(df)
+    target = config.get('target', 'Close')
+    ma_window = config.get('ma_window', 20)
+    features = config.get('features') or [c for c in ['Open', 'High', 'Low', f'MA_{ma_window}'] if c != target]
+    numeric_cols = engineer_features(frames, ma_window, features, config.get('scale', True), indicators, config.get('lags'), indicator_values)
+    missing = [c for c in features + [target] if c not in numeric_cols]
+    if missing:
+        raise ValueError(f"Columns not available as numeric features: {missing}")
+
+    walk_forward = config.get('walk_forward')
+    dates = frames.column('df', 'Date') if 'Date' in frames.columns('df') else None
+    if walk_forward:
+        # Chronological folds; the last one doubles as the train/test split
+        folds = walk_forward_folds(frames.n_rows, walk_forward.get('folds', 5), walk_forward.get('mode', "Expanding window"),
+                                   walk_forward.get('train_size'), gap=walk_forward.get('gap', 0), dates=dates)
+        train_rows, test_rows = folds[-1]
+    else:
+        train_rows, test_rows = split_rows(frames.n_rows, config.get('test_size', 20), config.get('random_state', 42))
+    X_train = frames.frame('df_features', columns=features, rows=train_rows)
+    X_test = frames.frame('df_features', columns=features, rows=test_rows)
+    y_train = frames.series('df_features', target, rows=train_rows)
+    y_test = frames.series('df_features', target, rows=test_rows)
+    target_is_continuous = is_continuous(y_train)
+
+    metrics = []
+    predictions = pd.DataFrame({'Actual': y_test.to_numpy()}, index=y_test.index)
+    if 'Date' in frames.columns('df'):
+        predictions.insert(0, 'Date', frames.series('df', 'Date', rows=test_rows).to_numpy())
+    models = {}
+    specs = config.get('models', [{'type': "Linear Regression"}])
+    labels = model_labels(specs)
+    for spec, label in zip(specs, labels):
+        model_type = spec['type']
+        mismatch = model_mismatch(model_type, target_is_continuous)
+        if not mismatch and spec.get('update'):
+            if not (model_type == "Linear Regression" and spec.get('online')):
+                mismatch = "Incremental updates need an online Linear Regression"
+            elif config.get('scale', True) or dates is None:
+                mismatch = "Incremental updates need dated, unscaled features (\"scale\": false)"
+        if mismatch:
+            metrics.append({'Model': label, 'Error': mismatch})
+        else:
+            models[label] = build_model(
+                model_type, target_is_continuous, spec.get('n_neighbors', 5),
+                spec.get('index', "Auto"), spec.get('leaf_size', DEFAULT_LEAF_SIZE), spec.get('n_probe', DEFAULT_N_PROBE),
+                spec.get('online', False)
+            )
+
+    # Online models kept in the artifact store absorb only the new rows instead of being refit
+    updated = {}
+    for spec, label in zip(specs, labels):
+        if spec.get('update') and label in models:
+            del models[label]
+            started = time.perf_counter()
+            key = fingerprint('online', config.get('symbol') or config.get('path'), target, features, ma_window,
+                              indicators, config.get('lags'), label)
+            model, _ = update_online_model(
+                ModelArtifactStore(config.get('artifact_dir', ARTIFACT_DIR)), key, X_train, y_train,
+                frames.series('df', 'Date', rows=train_rows), model_name=label
+            )
+            updated[label] = (model, time.perf_counter() - started)
+
+    fitted = {**fit_models(models, X_train, y_train), **updated}
+    predicted = predict_models({label: model for label, (model, _) in fitted.items()}, X_test)
+    if fitted:
+        scores = metrics_table(y_test, {label: y_pred for label, (y_pred, _) in predicted.items()}).set_index('Model')
+    for label, (model, fit_seconds) in fitted.items():
+        y_pred, predict_seconds = predicted[label]
+        predictions[label] = y_pred
+        if walk_forward:
+            X, y = frames.frame('df_features', columns=features), frames.series('df_features', target)
+            _, summary = walk_forward_cv(model, X, y, folds, dates, n_jobs=walk_forward.get('n_jobs', 1))
+            cv_scores = {'CV Mean RMSE': summary['Mean RMSE'], 'CV Mean R²': summary['Mean R²'], 'CV Pooled RMSE': summary['Pooled RMSE']}
+        else:
+            cv_scores = {}
+        metrics.append({
+            'Model': label,
+            'RMSE': scores.at[label, 'RMSE'],
+            'R²': scores.at[label, 'R²'],
+            'Fit (s)': fit_seconds,
+            'Predict (s)': predict_seconds,
+            'Train Rows': len(train_rows),
+            'Test Rows': len(test_rows),
+            **cv_scores,
+            'Error': None,
+        })
+
+    metrics.sort(key=lambda row: labels.index(row['Model']))
+    return pd.DataFrame(metrics), predictions
@@ -0,0 +1,289 @@
+# Stateful indicators that are updated bar by bar when new data is appended to a symbol.
+# IndicatorState.fit() computes the full history once (vectorized, through stock_ml.indicators)
+# and keeps only what the next bar needs: the last `window` inputs with their running mean and
+# sum of squared deviations (Welford), and the last value of every exponential average. Each
+# new bar then costs O(1) per indicator column and gives the same values as compute_indicators()
+# over the whole history. IndicatorStore persists the values and the state next to the OHLCV store,
+# one pair of files per symbol and indicator set.
+import json
+import math
+import os
+import threading
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from stock_ml.data_store import DATA_STORE_DIR, _naive_dates, _tmp_path
+from stock_ml.indicators import (
+    INDICATORS, MACD_FAST, MACD_SLOW, MACD_SIGNAL, BOLLINGER_STD, compute_indicators, ema
+)
+from stock_ml.stages import fingerprint
+
+
+# Helper function to get the input series compute_indicators() works on, as float arrays
+def _input_arrays(bars, indicators):
+    needed = sorted({col for name in indicators for col in INDICATORS[name][0]})
+    return {col: pd.to_numeric(bars[col], errors='coerce').ffill().bfill().to_numpy(dtype=np.float64) for col in needed}
+
+
+# Helper function to get the log return used by the Volatility indicator
+def _log_return(close, previous_close):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = float(np.log(close) - np.log(previous_close))
+    return value if math.isfinite(value) else 0.0
+
+
+class IndicatorState:
+    def __init__(self, indicators, columns, state):
+        self.indicators = {name: list(windows) for name, windows in indicators.items()}
+        self.columns = list(columns)
+        self.state = state
+
+    # Window sizes kept per input stream: closes for SMA/Bollinger, log returns for Volatility
+    @staticmethod
+    def _windows(indicators):
+        close_windows = sorted({w for name in ('SMA', 'Bollinger') for w in indicators.get(name, [])})
+        return close_windows, sorted(indicators.get('Volatility', []))
+
+    # Build the state from a full history. Returns (state, indicator values of the history).
+    # Raises ValueError when the history is shorter than the longest window.
+    @classmethod
+    def fit(cls, bars, indicators):
+        values = compute_indicators(bars, indicators)
+        data = _input_arrays(bars, indicators)
+        close = data['Close']
+        close_windows, return_windows = cls._windows(indicators)
+        longest = max(close_windows + return_windows + [1])
+        if len(close) < longest:
+            raise ValueError(f"Need at least {longest} bars to start incremental updates")
+
+        returns = np.diff(np.log(close), prepend=np.log(close[:1])) if return_windows else np.array([])
+        returns[~np.isfinite(returns)] = 0.0
+
+        def window_stats(series, windows):
+            stats = {}
+            for window in windows:
+                tail = series[-window:]
+                mean = float(tail.mean())
+                stats[str(window)] = [mean, float(((tail - mean) ** 2).sum())]
+            return stats
+
+        state = {
+            'close': float(close[-1]),
+            'closes': close[-close_windows[-1]:].tolist() if close_windows else [],
+            'close_stats': window_stats(close, close_windows),
+            'returns': returns[-return_windows[-1]:].tolist() if return_windows else [],
+            'return_stats': window_stats(returns, return_windows),
+            'ema': {},
+        }
+        for name, windows in indicators.items():
+            if name == 'EMA':
+                for w in windows:
+                    state['ema'][f'EMA_{w}'] = float(ema(close, [2.0 / (w + 1.0)])[-1, 0])
+            elif name == 'RSI':
+                change = np.diff(close, prepend=close[:1])
+                for w in windows:
+                    state['ema'][f'RSI_gain_{w}'] = float(ema(np.maximum(change, 0.0), [1.0 / w])[-1, 0])
+                    state['ema'][f'RSI_loss_{w}'] = float(ema(np.maximum(-change, 0.0), [1.0 / w])[-1, 0])
+            elif name == 'MACD':
+                fast, slow = ema(close, [2.0 / (MACD_FAST + 1.0), 2.0 / (MACD_SLOW + 1.0)])[-1]
+                state['ema'].update({'MACD_fast': float(fast), 'MACD_slow': float(slow), 'MACD_Signal': float(values['MACD_Signal'].iloc[-1])})
+            elif name == 'ATR':
+                for w in windows:
+                    state['ema'][f'ATR_{w}'] = float(values[f'ATR_{w}'].iloc[-1])
+            elif name == 'OBV':
+                state['obv'] = float(values['OBV'].iloc[-1])
+        return cls(indicators, values.columns, state), values
+
+    # Slide one window forward: add x, drop the value that falls out (Welford update)
+    @staticmethod
+    def _slide(stats, buffer, x):
+        for key, (mean, m2) in stats.items():
+            window = int(key)
+            y = buffer[-window]
+            new_mean = mean + (x - y) / window
+            stats[key] = [new_mean, m2 + (x - y) * (x - new_mean + y - mean)]
+
+    @staticmethod
+    def _std(stats, window):
+        if window < 2:
+            return np.nan
+        return math.sqrt(max(stats[str(window)][1], 0.0) / (window - 1))
+
+    # Advance the state by one bar and return {column: value}
+    def _step(self, close, high, low, volume):
+        s = self.state
+        previous_close = s['close']
+        change = close - previous_close
+        if s['closes']:
+            self._slide(s['close_stats'], s['closes'], close)
+            s['closes'].append(close)
+            s['closes'].popleft()
+        if s['returns']:
+            r = _log_return(close, previous_close)
+            self._slide(s['return_stats'], s['returns'], r)
+            s['returns'].append(r)
+            s['returns'].popleft()
+
+        def smooth(key, x, alpha):
+            s['ema'][key] = alpha * x + (1.0 - alpha) * s['ema'][key]
+            return s['ema'][key]
+
+        row = {}
+        for name, windows in self.indicators.items():
+            if name == 'SMA':
+                for w in windows:
+                    row[f'SMA_{w}'] = s['close_stats'][str(w)][0]
+            elif name == 'EMA':
+                for w in windows:
+                    row[f'EMA_{w}'] = smooth(f'EMA_{w}', close, 2.0 / (w + 1.0))
+            elif name == 'RSI':
+                for w in windows:
+                    gain = smooth(f'RSI_gain_{w}', max(change, 0.0), 1.0 / w)
+                    loss = smooth(f'RSI_loss_{w}', max(-change, 0.0), 1.0 / w)
+                    if gain == 0 and loss == 0:
+                        row[f'RSI_{w}'] = 50.0
+                    else:
+                        row[f'RSI_{w}'] = 100.0 - 100.0 / (1.0 + gain / loss) if loss > 0 else 100.0
+            elif name == 'MACD':
+                fast = smooth('MACD_fast', close, 2.0 / (MACD_FAST + 1.0))
+                slow = smooth('MACD_slow', close, 2.0 / (MACD_SLOW + 1.0))
+                signal = smooth('MACD_Signal', fast - slow, 2.0 / (MACD_SIGNAL + 1.0))
+                row.update({'MACD': fast - slow, 'MACD_Signal': signal, 'MACD_Hist': fast - slow - signal})
+            elif name == 'Bollinger':
+                for w in windows:
+                    mean, band = s['close_stats'][str(w)][0], BOLLINGER_STD * self._std(s['close_stats'], w)
+                    row[f'BB_Upper_{w}'] = mean + band
+                    row[f'BB_Lower_{w}'] = mean - band
+            elif name == 'ATR':
+                true_range = max(high - low, abs(high - previous_close), abs(low - previous_close))
+                for w in windows:
+                    row[f'ATR_{w}'] = smooth(f'ATR_{w}', true_range, 1.0 / w)
+            elif name == 'OBV':
+                s['obv'] += float(np.sign(change)) * volume
+                row['OBV'] = s['obv']
+            elif name == 'Volatility':
+                for w in windows:
+                    row[f'Volatility_{w}'] = self._std(s['return_stats'], w)
+        s['close'] = close
+        return row
+
+    # Feed newly appended bars; returns their indicator values (same columns as fit())
+    def update(self, new_bars):
+        self.state['closes'] = deque(self.state['closes'])
+        self.state['returns'] = deque(self.state['returns'])
+        try:
+            columns = {col: new_bars[col].to_numpy(dtype=np.float64) for col in ('Close', 'High', 'Low', 'Volume') if col in new_bars.columns}
+            out = np.empty((len(new_bars), len(self.columns)))
+            for i in range(len(new_bars)):
+                close = float(columns['Close'][i])
+                if not math.isfinite(close):
+                    close = self.state['close']
+                row = self._step(
+                    close,
+                    float(columns['High'][i]) if 'High' in columns else close,
+                    float(columns['Low'][i]) if 'Low' in columns else close,
+                    float(columns['Volume'][i]) if 'Volume' in columns else 0.0,
+                )
+                out[i] = [row[col] for col in self.columns]
+        finally:
+            self.state['closes'] = list(self.state['closes'])
+            self.state['returns'] = list(self.state['returns'])
+        return pd.DataFrame(out, index=new_bars.index, columns=self.columns)
+
+    def to_dict(self):
+        return {'indicators': self.indicators, 'columns': self.columns, 'state': self.state}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['indicators'], data['columns'], data['state'])
+
+
+class IndicatorStore:
+    # Indicator values per symbol in <root>/<SYMBOL>.indicators.<set>.parquet (with the bars'
+    # Date column) and the incremental state in <root>/<SYMBOL>.indicators.<set>.json, where <set>
+    # fingerprints the indicators, windows and first bar date, so different indicator sets and
+    # histories starting on different days do not evict each other
+    def __init__(self, root=DATA_STORE_DIR):
+        self.root = Path(root)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _symbol_lock(self, symbol):
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _stem(self, symbol, indicators, start):
+        return f"{symbol.upper()}.indicators.{fingerprint(sorted(indicators.items()), start)[:12]}"
+
+    def _values_path(self, stem):
+        return self.root / f"{stem}.parquet"
+
+    def _state_path(self, stem):
+        return self.root / f"{stem}.json"
+
+    def _read_state(self, stem):
+        path = self._state_path(stem)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _write(self, stem, values, saved):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = _tmp_path(self._values_path(stem))
+        values.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self._values_path(stem))
+        tmp_path = _tmp_path(self._state_path(stem))
+        with open(tmp_path, 'w') as f:
+            json.dump(saved, f)
+        os.replace(tmp_path, self._state_path(stem))
+
+    # Bring a symbol's indicators up to date with `bars` (a contiguous, date-sorted history) and
+    # return them with a Date column. Only bars after the last saved one are processed when the
+    # saved state was built for the same indicators and the saved last bar (date and close) is
+    # still at the same position; anything else (new indicators, bars inserted before it, a
+    # revised last bar, a history too short for the state) is recomputed in full.
+    def refresh(self, symbol, bars, indicators):
+        indicators = {name: sorted(set(windows)) for name, windows in indicators.items()}
+        dates = _naive_dates(bars['Date']).reset_index(drop=True)
+        stem = self._stem(symbol, indicators, dates.iloc[0].isoformat() if len(bars) else None)
+        with self._symbol_lock(symbol.upper()):
+            saved = self._read_state(stem)
+            rows = saved['rows'] if saved else 0
+            resumable = (
+                saved is not None
+                and saved.get('state') is not None
+                and saved['indicators'] == indicators
+                and 0 < rows <= len(bars)
+                and dates[rows - 1] == pd.Timestamp(saved['last_date'])
+                and float(bars['Close'].iloc[rows - 1]) == saved['last_close']
+                and self._values_path(stem).exists()
+            )
+            if resumable:
+                values = pd.read_parquet(self._values_path(stem))
+                if rows == len(bars):
+                    return values
+                state = IndicatorState.from_dict(saved['state'])
+                new_bars = bars.iloc[rows:]
+                appended = state.update(new_bars)
+                appended.insert(0, 'Date', new_bars['Date'].to_numpy())
+                values = pd.concat([values, appended], ignore_index=True)
+            else:
+                try:
+                    state, values = IndicatorState.fit(bars, indicators)
+                except ValueError:
+                    state, values = None, compute_indicators(bars, indicators)
+                values = values.reset_index(drop=True)
+                values.insert(0, 'Date', bars['Date'].to_numpy())
+
+            self._write(stem, values, {
+                'indicators': indicators,
+                'rows': len(bars),
+                'last_date': dates.iloc[-1].isoformat() if len(bars) else None,
+                'last_close': float(bars['Close'].iloc[-1]) if len(bars) else None,
+                'state': state.to_dict() if state is not None else None,
+            })
+            return values
@@ -0,0 +1,184 @@
+# Vectorized technical indicators for the feature engineering step.
+# Window statistics come from one cumulative sum per input (any number of windows are then a
+# single vectorized subtraction), and exponential smoothing runs through scipy's lfilter, so a
+# whole indicator family is computed in one pass instead of one pandas rolling call per window.
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# Indicator name -> (required columns, whether it takes windows)
+INDICATORS = {
+    'SMA': (['Close'], True),
+    'EMA': (['Close'], True),
+    'RSI': (['Close'], True),
+    'MACD': (['Close'], False),
+    'Bollinger': (['Close'], True),
+    'ATR': (['High', 'Low', 'Close'], True),
+    'OBV': (['Close', 'Volume'], False),
+    'Volatility': (['Close'], True),
+}
+DEFAULT_WINDOWS = [5, 10, 20, 50]
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BOLLINGER_STD = 2.0
+
+
+# Helper function to parse "5, 10, 20" into a sorted list of unique positive windows
+def parse_windows(text):
+    windows = set()
+    for token in str(text).replace(';', ',').replace(' ', ',').split(','):
+        if token.strip():
+            window = int(token)
+            if window < 1:
+                raise ValueError(f"Window must be positive: {window}")
+            windows.add(window)
+    return sorted(windows)
+
+
+# Rolling mean of every window at once: one column per window, NaN until the window is full
+# (or, with warmup='expanding', the mean of the bars seen so far, so no later bar leaks into the
+# warm-up rows). Without warm-up values, windows longer than the series are NaN.
+def rolling_mean(values, windows, warmup='nan'):
+    values = np.asarray(values, dtype=np.float64)
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    out = np.full((len(windows), len(values)), np.nan)
+    for j, window in enumerate(windows):
+        if window <= len(values):
+            out[j, window - 1:] = csum[window:]
+            out[j, window - 1:] -= csum[:-window]
+            out[j, window - 1:] /= window
+        if warmup == 'expanding':
+            warm = min(window - 1, len(values))
+            out[j, :warm] = csum[1:warm + 1] / np.arange(1, warm + 1)
+    return out.T
+
+
+# Rolling sample standard deviation (ddof=1) of every window at once. The series is centered
+# first so the sum-of-squares difference does not lose precision on large price levels. With
+# warmup='expanding' the warm-up rows hold the standard deviation of the bars seen so far (0 for
+# the first bar).
+def rolling_std(values, windows, warmup='nan'):
+    values = np.asarray(values, dtype=np.float64)
+    centered = values - values.mean() if len(values) else values
+    csum = np.concatenate(([0.0], np.cumsum(centered)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+    out = np.full((len(windows), len(values)), np.nan)
+    for j, window in enumerate(windows):
+        if 1 < window <= len(values):
+            total = csum[window:] - csum[:-window]
+            variance = csum_sq[window:] - csum_sq[:-window]
+            variance -= total * total / window
+            variance /= window - 1
+            np.sqrt(np.maximum(variance, 0.0, out=variance), out=out[j, window - 1:])
+        if warmup == 'expanding':
+            warm = min(max(window - 1, 1), len(values))
+            count = np.arange(1, warm + 1)
+            variance = csum_sq[1:warm + 1] - csum[1:warm + 1] ** 2 / count
+            variance /= np.maximum(count - 1, 1)
+            out[j, :warm] = np.sqrt(np.maximum(variance, 0.0))
+    return out.T
+
+
+# Exponential moving average y[t] = alpha * x[t] + (1 - alpha) * y[t-1], seeded with x[0]
+# (pandas ewm(adjust=False)); alpha may be a list to smooth with several spans at once
+def ema(values, alphas):
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty((len(alphas), len(values)))
+    if not len(values):
+        return out.T
+    for j, alpha in enumerate(alphas):
+        out[j], _ = lfilter([alpha], [1.0, alpha - 1.0], values, zi=[(1.0 - alpha) * values[0]])
+    return out.T
+
+
+def _span_alphas(windows):
+    return [2.0 / (window + 1.0) for window in windows]
+
+
+def _wilder_alphas(windows):
+    return [1.0 / window for window in windows]
+
+
+# Helper function to compute one indicator family for one contiguous price history.
+# Returns {column name: array}.
+def _indicator_columns(name, data, windows):
+    close = data['Close']
+    if name == 'SMA':
+        return dict(zip([f'SMA_{w}' for w in windows], rolling_mean(close, windows, 'expanding').T))
+    if name == 'EMA':
+        return dict(zip([f'EMA_{w}' for w in windows], ema(close, _span_alphas(windows)).T))
+    if name == 'RSI':
+        change = np.diff(close, prepend=close[:1])
+        gains = ema(np.maximum(change, 0.0), _wilder_alphas(windows))
+        losses = ema(np.maximum(-change, 0.0), _wilder_alphas(windows))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(losses > 0, 100.0 - 100.0 / (1.0 + gains / losses), 100.0)
+        rsi[(gains == 0) & (losses == 0)] = 50.0
+        return dict(zip([f'RSI_{w}' for w in windows], rsi.T))
+    if name == 'MACD':
+        fast, slow = ema(close, _span_alphas([MACD_FAST, MACD_SLOW])).T
+        macd = fast - slow
+        signal = ema(macd, _span_alphas([MACD_SIGNAL]))[:, 0]
+        return {'MACD': macd, 'MACD_Signal': signal, 'MACD_Hist': macd - signal}
+    if name == 'Bollinger':
+        mean = rolling_mean(close, windows, 'expanding')
+        band = BOLLINGER_STD * rolling_std(close, windows, 'expanding')
+        columns = {}
+        for j, window in enumerate(windows):
+            columns[f'BB_Upper_{window}'] = mean[:, j] + band[:, j]
+            columns[f'BB_Lower_{window}'] = mean[:, j] - band[:, j]
+        return columns
+    if name == 'ATR':
+        previous_close = np.concatenate((close[:1], close[:-1]))
+        true_range = np.maximum.reduce([
+            data['High'] - data['Low'],
+            np.abs(data['High'] - previous_close),
+            np.abs(data['Low'] - previous_close),
+        ])
+        return dict(zip([f'ATR_{w}' for w in windows], ema(true_range, _wilder_alphas(windows)).T))
+    if name == 'OBV':
+        direction = np.sign(np.diff(close, prepend=close[:1]))
+        return {'OBV': np.cumsum(direction * data['Volume'])}
+    if name == 'Volatility':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.diff(np.log(close), prepend=np.log(close[:1]))
+        returns[~np.isfinite(returns)] = 0.0
+        return dict(zip([f'Volatility_{w}' for w in windows], rolling_std(returns, windows, 'expanding').T))
+    raise ValueError(f"Unknown indicator: {name}")
+
+
+# Compute indicator features for a price frame.
+# `indicators` maps indicator name -> list of windows (ignored for MACD and OBV). With `symbols`
+# (panel data) every symbol is computed over its own history only. Warm-up rows, where a window
+# is not full yet, hold the value over the bars seen so far (an expanding window), so every row
+# stays usable without looking ahead; a window longer than a symbol's history is all warm-up.
+def compute_indicators(df, indicators, symbols=None):
+    needed = sorted({col for name in indicators for col in INDICATORS[name][0]})
+    missing = [col for col in needed if col not in df.columns]
+    if missing:
+        raise ValueError(f"Indicators need the column(s): {', '.join(missing)}")
+    values = {col: pd.to_numeric(df[col], errors='coerce').ffill().bfill().to_numpy(dtype=np.float64) for col in needed}
+
+    if not len(df):
+        return pd.DataFrame(index=df.index)
+    if symbols is None:
+        segments = [np.arange(len(df))]
+    else:
+        codes = pd.factorize(np.asarray(symbols))[0]
+        order = np.argsort(codes, kind='stable')
+        segments = np.split(order, np.flatnonzero(np.diff(codes[order])) + 1)
+
+    # One (columns x rows) block, so every result is written into a contiguous row
+    names, block = None, None
+    for rows in segments:
+        contiguous = rows[-1] - rows[0] == len(rows) - 1
+        target = slice(rows[0], rows[-1] + 1) if contiguous else rows
+        data = {col: values[col][target] for col in needed}
+        results = {}
+        for name, windows in indicators.items():
+            results.update(_indicator_columns(name, data, windows))
+        if block is None:
+            names = list(results)
+            block = np.empty((len(names), len(df)))
+        for i, col in enumerate(names):
+            block[i, target] = results[col]
+    return pd.DataFrame(block.T, index=df.index, columns=names, copy=False)
@@ -0,0 +1,76 @@
+# Chunked, memory-bounded CSV ingestion for large uploads
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from stock_ml.cleaning import NULL_TOKENS, apply_numeric_plan, cleaning_report, infer_numeric_plan
+from stock_ml.memory import downcast_numeric, frame_memory_mb
+
+DEFAULT_CHUNK_ROWS = 250_000
+DEFAULT_MEMORY_LIMIT_MB = float(os.environ.get('STOCK_ML_MAX_UPLOAD_MB', 2048))
+
+
+class MemoryLimitExceeded(Exception):
+    pass
+
+
+# Helper function to yield DataFrame chunks with the pandas C parser
+def _pandas_chunks(source, usecols, chunk_rows):
+    yield from pd.read_csv(source, usecols=usecols, chunksize=chunk_rows)
+
+
+# Helper function to yield DataFrame chunks from pyarrow's streaming CSV reader
+def _pyarrow_chunks(source, usecols, chunk_rows):
+    reader = pa_csv.open_csv(
+        source,
+        # Blocks are sized in bytes; ~64 bytes per row keeps them close to chunk_rows
+        read_options=pa_csv.ReadOptions(block_size=max(1 << 20, chunk_rows * 64)),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=usecols,
+            null_values=NULL_TOKENS,
+            strings_can_be_null=True,
+        ),
+    )
+    for batch in reader:
+        yield pa.Table.from_batches([batch]).to_pandas()
+
+
+# Read a CSV in chunks, cleaning and downcasting each chunk before it is kept.
+# `usecols` restricts the columns read, `engine` is 'pandas' or 'pyarrow', and the loaded
+# data may not exceed `memory_limit_mb` (MemoryLimitExceeded is raised as soon as it does).
+# The numeric cleaning plan is inferred on the first chunk and reused for the rest so every
+# chunk ends up with the same columns converted. Returns (df, cleaning report).
+def read_csv_chunked(source, usecols=None, chunk_rows=DEFAULT_CHUNK_ROWS, engine='pandas',
+                     memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB, downcast=True):
+    read_chunks = _pyarrow_chunks if engine == 'pyarrow' else _pandas_chunks
+    chunks = []
+    plan = None
+    unparsed_counts = {}
+    rows = 0
+    used_mb = 0.0
+
+    for chunk in read_chunks(source, usecols, chunk_rows):
+        if plan is None:
+            plan = infer_numeric_plan(chunk)
+        chunk, chunk_unparsed = apply_numeric_plan(chunk, plan)
+        for col, count in chunk_unparsed.items():
+            unparsed_counts[col] = unparsed_counts.get(col, 0) + count
+        if downcast:
+            chunk = downcast_numeric(chunk)
+
+        rows += len(chunk)
+        used_mb += frame_memory_mb(chunk)
+        if memory_limit_mb is not None and used_mb > memory_limit_mb:
+            raise MemoryLimitExceeded(
+                f"Loaded data exceeded the {memory_limit_mb:,.0f} MB memory limit after {rows:,} rows "
+                f"({used_mb:,.1f} MB). Select fewer columns or raise the limit."
+            )
+        chunks.append(chunk)
+
+    if not chunks:
+        return pd.DataFrame(columns=usecols or []), cleaning_report({}, {})
+
+    df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    return df, cleaning_report(plan, unparsed_counts)
@@ -0,0 +1,199 @@
+# Neighbor index backends for K-Nearest Neighbors on long price histories.
+# The exact backends are scikit-learn's brute force, KD-tree and ball tree (the trees with a
+# tunable leaf size). The approximate backend is an inverted-file index: k-means splits the
+# training rows into about sqrt(n) cells, and a query only scans the rows of the `n_probe`
+# cells whose centroids are nearest to it, trading a little recall for much less work per query.
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin, RegressorMixin
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics.pairwise import euclidean_distances
+from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor, NearestNeighbors
+
+KNN_INDEX_BACKENDS = ["Auto", "Brute force", "KD-tree", "Ball tree", "Approximate (IVF)"]
+KNN_ALGORITHMS = {"Auto": 'auto', "Brute force": 'brute', "KD-tree": 'kd_tree', "Ball tree": 'ball_tree'}
+TREE_BACKENDS = ["KD-tree", "Ball tree"]
+LEAF_SIZE_CANDIDATES = (10, 20, 30, 50, 100)
+DEFAULT_LEAF_SIZE = 30
+DEFAULT_N_PROBE = 8
+KMEANS_SAMPLE_SIZE = 100_000
+
+
+class _ApproximateKNeighbors(BaseEstimator):
+    def __init__(self, n_neighbors=5, n_lists=None, n_probe=DEFAULT_N_PROBE, random_state=0):
+        self.n_neighbors = n_neighbors
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.random_state = random_state
+
+    # Cluster (a sample of) the rows and store them grouped by cell, so every cell is one
+    # contiguous block of the training matrix
+    def fit(self, X, y):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        y = np.asarray(y)
+        n_lists = self.n_lists or int(np.sqrt(len(X)))
+        n_lists = int(np.clip(n_lists, 1, len(X)))
+
+        rng = np.random.default_rng(self.random_state)
+        sample = X if len(X) <= KMEANS_SAMPLE_SIZE else X[rng.choice(len(X), KMEANS_SAMPLE_SIZE, replace=False)]
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, n_init=1, batch_size=4096, random_state=self.random_state)
+        kmeans.fit(sample)
+        self.centroids_ = kmeans.cluster_centers_
+        cells = kmeans.predict(X)
+
+        order = np.argsort(cells, kind='stable')
+        self.index_ = order
+        self.fit_X_ = X[order]
+        self.fit_y_ = y[order]
+        self.offsets_ = np.r_[0, np.cumsum(np.bincount(cells, minlength=n_lists))]
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    # (squared distances, positions in the cell-ordered training matrix) of the nearest rows
+    # found in the probed cells, sorted by distance. Works one cell at a time over all queries
+    # that probe it, keeping a running top-k per query.
+    def _search(self, X, n_neighbors=None):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        k = min(n_neighbors or self.n_neighbors, len(self.fit_X_))
+        n_probe = min(self.n_probe, len(self.centroids_))
+
+        centroid_distances = euclidean_distances(X, self.centroids_, squared=True)
+        probes = np.argpartition(centroid_distances, n_probe - 1, axis=1)[:, :n_probe].ravel()
+        queries = np.repeat(np.arange(len(X)), n_probe)
+        by_cell = np.argsort(probes, kind='stable')
+        cells, starts = np.unique(probes[by_cell], return_index=True)
+        ends = np.r_[starts[1:], len(by_cell)]
+
+        best_distances = np.full((len(X), k), np.inf)
+        best_rows = np.zeros((len(X), k), dtype=np.intp)
+        for cell, start, end in zip(cells, starts, ends):
+            lo, hi = self.offsets_[cell], self.offsets_[cell + 1]
+            if lo == hi:
+                continue
+            rows = queries[by_cell[start:end]]
+            distances = np.hstack((best_distances[rows], euclidean_distances(X[rows], self.fit_X_[lo:hi], squared=True)))
+            candidates = np.hstack((best_rows[rows], np.broadcast_to(np.arange(lo, hi), (len(rows), hi - lo))))
+            top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            best_distances[rows] = np.take_along_axis(distances, top, axis=1)
+            best_rows[rows] = np.take_along_axis(candidates, top, axis=1)
+
+        order = np.argsort(best_distances, axis=1, kind='stable')
+        best_distances = np.take_along_axis(best_distances, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        # Queries whose probed cells hold fewer than k rows repeat their nearest neighbor
+        missing = np.isinf(best_distances)
+        best_rows[missing] = np.broadcast_to(best_rows[:, :1], best_rows.shape)[missing]
+        best_distances[missing] = np.broadcast_to(best_distances[:, :1], best_distances.shape)[missing]
+        return best_distances, best_rows
+
+    # (distances, row positions in the training data), like NearestNeighbors.kneighbors
+    def kneighbors(self, X, n_neighbors=None):
+        distances, rows = self._search(X, n_neighbors)
+        return np.sqrt(distances), self.index_[rows]
+
+    # Targets of the neighbors of every query, as an (n_queries, k) array
+    def _neighbor_targets(self, X):
+        return self.fit_y_[self._search(X)[1]]
+
+
+class ApproximateKNeighborsRegressor(RegressorMixin, _ApproximateKNeighbors):
+    def predict(self, X):
+        return self._neighbor_targets(X).astype(np.float64).mean(axis=1)
+
+
+class ApproximateKNeighborsClassifier(ClassifierMixin, _ApproximateKNeighbors):
+    def fit(self, X, y):
+        self.classes_, codes = np.unique(np.asarray(y), return_inverse=True)
+        return super().fit(X, codes)
+
+    def _votes(self, X):
+        codes = self._neighbor_targets(X)
+        votes = np.zeros((len(codes), len(self.classes_)), dtype=np.int32)
+        np.add.at(votes, (np.repeat(np.arange(len(codes)), codes.shape[1]), codes.ravel()), 1)
+        return votes
+
+    # Majority vote; ties go to the smallest class label, as in scikit-learn
+    def predict(self, X):
+        return self.classes_[self._votes(X).argmax(axis=1)]
+
+    # Share of the neighbors in every class, like KNeighborsClassifier with uniform weights
+    def predict_proba(self, X):
+        votes = self._votes(X)
+        return votes / votes.sum(axis=1, keepdims=True)
+
+
+# KNN estimator for a backend: the exact ones are the scikit-learn estimators with the
+# matching `algorithm`, so they predict exactly like the default KNN model
+def build_knn(n_neighbors=5, classifier=False, backend="Auto", leaf_size=DEFAULT_LEAF_SIZE, n_probe=DEFAULT_N_PROBE):
+    if backend == "Approximate (IVF)":
+        estimator = ApproximateKNeighborsClassifier if classifier else ApproximateKNeighborsRegressor
+        return estimator(n_neighbors=n_neighbors, n_probe=n_probe)
+    if backend not in KNN_ALGORITHMS:
+        raise ValueError(f"Unknown neighbor index backend: {backend}")
+    estimator = KNeighborsClassifier if classifier else KNeighborsRegressor
+    return estimator(n_neighbors=n_neighbors, algorithm=KNN_ALGORITHMS[backend], leaf_size=leaf_size)
+
+
+def _timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+# Build time, query latency and accuracy loss of every backend on the same data. Accuracy is
+# measured against exact brute-force neighbors: recall@k (share of the true k nearest rows
+# found) and the RMSE between the backend's predictions and the exact KNN predictions.
+# Tree backends are run for every leaf size in `leaf_sizes`.
+def benchmark_backends(X_train, y_train, X_query, n_neighbors=5, backends=None, leaf_sizes=LEAF_SIZE_CANDIDATES, n_probe=DEFAULT_N_PROBE):
+    X_train = np.ascontiguousarray(X_train, dtype=np.float64)
+    X_query = np.ascontiguousarray(X_query, dtype=np.float64)
+    y_train = np.asarray(y_train)
+    # Class labels are compared through their codes
+    y_train = y_train.astype(np.float64) if np.issubdtype(y_train.dtype, np.number) else pd.factorize(y_train)[0].astype(np.float64)
+    n_neighbors = min(n_neighbors, len(X_train))
+    backends = backends or KNN_INDEX_BACKENDS[1:]
+
+    exact = NearestNeighbors(n_neighbors=n_neighbors, algorithm='brute').fit(X_train)
+    _, true_neighbors = exact.kneighbors(X_query)
+    true_prediction = y_train[true_neighbors].mean(axis=1)
+
+    runs = []
+    for backend in backends:
+        if backend in TREE_BACKENDS:
+            runs.extend((backend, leaf_size) for leaf_size in leaf_sizes)
+        else:
+            runs.append((backend, None))
+
+    rows = []
+    for backend, leaf_size in runs:
+        if backend == "Approximate (IVF)":
+            index = ApproximateKNeighborsRegressor(n_neighbors=n_neighbors, n_probe=n_probe)
+        else:
+            index = NearestNeighbors(n_neighbors=n_neighbors, algorithm=KNN_ALGORITHMS[backend], leaf_size=leaf_size or DEFAULT_LEAF_SIZE)
+        _, build_seconds = _timed(index.fit, X_train, y_train)
+        (_, neighbors), query_seconds = _timed(index.kneighbors, X_query)
+
+        found = (neighbors[:, :, None] == true_neighbors[:, None, :]).any(axis=2).sum()
+        prediction = y_train[neighbors].mean(axis=1)
+        rows.append({
+            'Backend': backend,
+            'Leaf Size': leaf_size,
+            'Build (s)': build_seconds,
+            'Query (s)': query_seconds,
+            'Latency (ms/query)': 1000.0 * query_seconds / max(len(X_query), 1),
+            'Recall@k': found / true_neighbors.size,
+            'Prediction RMSE vs Exact': np.sqrt(np.mean((prediction - true_prediction) ** 2)),
+        })
+    return pd.DataFrame(rows)
+
+
+# Leaf size with the lowest build + query time for each tree backend in a benchmark table
+def best_leaf_sizes(benchmark):
+    trees = benchmark[benchmark['Backend'].isin(TREE_BACKENDS)]
+    if trees.empty:
+        return {}
+    total = trees['Build (s)'] + trees['Query (s)']
+    best = trees.loc[total.groupby(trees['Backend']).idxmin()]
+    return dict(zip(best['Backend'], best['Leaf Size'].astype(int)))
@@ -0,0 +1,62 @@
+# Single-pass K-Nearest Neighbors sweep.
+# One neighbor query at the largest k gives, for every validation row, its neighbors sorted by
+# distance; the prediction for any smaller k only uses the first k of them. Cumulative sums (or
+# cumulative class votes) over that neighbor matrix give the predictions of every k at once,
+# which are exactly what KNeighborsRegressor/KNeighborsClassifier(n_neighbors=k) would return.
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import NearestNeighbors
+
+KNN_SWEEP_MAX_K = 50
+KNN_VALIDATION_FRACTION = 0.2
+
+
+# Helper function to carve a validation set from the end of the training rows (the latest
+# rows for a walk-forward split, a random subset for a random split)
+def validation_split(n_rows, fraction=KNN_VALIDATION_FRACTION):
+    n_validation = max(1, int(round(n_rows * fraction)))
+    return np.arange(n_rows - n_validation), np.arange(n_rows - n_validation, n_rows)
+
+
+# Predictions for k = 1..max_k from one kneighbors() query: an (n_validation, max_k) array
+# whose column k-1 holds the k-neighbor prediction
+def sweep_predictions(X_train, y_train, X_validation, max_k=KNN_SWEEP_MAX_K, classifier=False):
+    max_k = min(max_k, len(X_train))
+    _, neighbors = NearestNeighbors(n_neighbors=max_k).fit(X_train).kneighbors(X_validation)
+    y_train = np.asarray(y_train)
+
+    if not classifier:
+        neighbor_targets = y_train.astype(np.float64)[neighbors]
+        return np.cumsum(neighbor_targets, axis=1) / np.arange(1, max_k + 1)
+
+    # Cumulative votes per class; ties go to the smallest class label, as in scikit-learn
+    classes, codes = np.unique(y_train, return_inverse=True)
+    neighbor_codes = codes[neighbors]
+    votes = np.zeros((len(X_validation), len(classes)), dtype=np.int32)
+    predictions = np.empty((len(X_validation), max_k), dtype=np.intp)
+    rows = np.arange(len(X_validation))
+    for k in range(max_k):
+        votes[rows, neighbor_codes[:, k]] += 1
+        predictions[:, k] = votes.argmax(axis=1)
+    return classes[predictions]
+
+
+# Validation curve for k = 1..max_k and the recommended k (lowest RMSE, or highest accuracy
+# for a classifier). Returns (curve DataFrame, best k).
+def knn_sweep(X_train, y_train, X_validation, y_validation, max_k=KNN_SWEEP_MAX_K, classifier=False):
+    predictions = sweep_predictions(X_train, y_train, X_validation, max_k, classifier)
+    y_validation = np.asarray(y_validation)
+    errors = predictions.astype(np.float64) - y_validation.astype(np.float64)[:, None]
+    sse = (errors ** 2).sum(axis=0)
+    sst = ((y_validation - y_validation.mean()) ** 2).sum()
+    curve = pd.DataFrame({
+        'k': np.arange(1, predictions.shape[1] + 1),
+        'RMSE': np.sqrt(sse / len(y_validation)),
+        'R²': 1.0 - sse / sst if sst > 0 else np.nan,
+    })
+    if classifier:
+        curve['Accuracy'] = (predictions == y_validation[:, None]).mean(axis=0)
+        best_k = int(curve.loc[curve['Accuracy'].idxmax(), 'k'])
+    else:
+        best_k = int(curve.loc[curve['RMSE'].idxmin(), 'k'])
+    return curve, best_k
@@ -0,0 +1,86 @@
+# Lag and trailing-return features built on a strided view of the series.
+# The series is stored once (padded with `max_lag` copies of its first value); the k-lag matrix
+# is a sliding_window_view over that buffer, so its memory stays flat as k grows. A column is
+# only materialized when it is picked as a feature.
+import re
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+_LAG_NAME = re.compile(r'^(?P<column>.+)_(?P<kind>lag|ret)_(?P<n>\d+)$')
+
+
+class LagFeatures:
+    # `symbols` (panel data) keeps every lag inside its own symbol's history: rows are grouped
+    # per symbol (stable, so dates stay in order) before the view is built
+    def __init__(self, series, max_lag, return_windows=(), symbols=None):
+        self.column = series.name
+        self.max_lag = int(max_lag)
+        self.return_windows = sorted({int(w) for w in return_windows if 0 < int(w) <= self.max_lag})
+        values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+
+        if symbols is None:
+            self._order = None
+            self._group_start = np.zeros(len(values), dtype=np.int64)
+        else:
+            codes = pd.factorize(np.asarray(symbols))[0]
+            self._order = np.argsort(codes, kind='stable')
+            values = values[self._order]
+            sorted_codes = codes[self._order]
+            starts = np.r_[0, np.flatnonzero(np.diff(sorted_codes)) + 1]
+            self._group_start = np.repeat(starts, np.diff(np.r_[starts, len(values)]))
+
+        first = values[0] if len(values) else np.nan
+        self._buffer = np.concatenate((np.full(self.max_lag, first), values))
+        self._values = self._buffer[self.max_lag:]
+
+    # (n_rows, max_lag) view: column j-1 holds the value j rows back. No data is copied.
+    @property
+    def matrix(self):
+        if not self.max_lag:
+            return np.empty((len(self._values), 0))
+        return sliding_window_view(self._buffer, self.max_lag)[:len(self._values), ::-1]
+
+    @property
+    def nbytes(self):
+        return self._buffer.nbytes + self._group_start.nbytes + (self._order.nbytes if self._order is not None else 0)
+
+    def names(self):
+        lags = [f'{self.column}_lag_{j}' for j in range(1, self.max_lag + 1)]
+        returns = [f'{self.column}_ret_{w}' for w in self.return_windows]
+        return lags + returns
+
+    def __contains__(self, name):
+        match = _LAG_NAME.match(str(name))
+        if not match or match['column'] != self.column:
+            return False
+        n = int(match['n'])
+        return 1 <= n <= self.max_lag if match['kind'] == 'lag' else n in self.return_windows
+
+    # Value `lag` rows back, with rows near the start of a symbol repeating its first value
+    def _lagged(self, lag):
+        lagged = self.matrix[:, lag - 1].copy()
+        if self._order is not None:
+            positions = np.arange(len(lagged))
+            early = positions - self._group_start < lag
+            lagged[early] = self._values[self._group_start[early]]
+        return lagged
+
+    # Materialize one lag (<column>_lag_<k>) or trailing return (<column>_ret_<k>) column
+    # in the original row order
+    def feature(self, name):
+        if name not in self:
+            raise KeyError(name)
+        match = _LAG_NAME.match(name)
+        lagged = self._lagged(int(match['n']))
+        if match['kind'] == 'lag':
+            values = lagged
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.where(lagged != 0, self._values / lagged - 1.0, 0.0)
+        if self._order is not None:
+            out = np.empty_like(values)
+            out[self._order] = values
+            values = out
+        return values
@@ -0,0 +1,109 @@
+# Single-copy frame lineage: the loaded frame is stored once and every later stage keeps only
+# the columns it adds or modifies, plus named row selections (e.g. the train/test split)
+import numpy as np
+import pandas as pd
+
+from stock_ml.memory import frame_memory_mb
+from stock_ml.stages import fingerprint
+
+
+class FrameLineage:
+    def __init__(self, base, base_name='df'):
+        self.base_name = base_name
+        self._stages = {base_name: (None, base)}
+        self._rows = {}
+        self._fingerprint = None
+
+    def __contains__(self, stage):
+        return stage in self._stages
+
+    @property
+    def n_rows(self):
+        return len(self._stages[self.base_name][1])
+
+    # The loaded frame itself; treat it as read-only
+    @property
+    def base(self):
+        return self._stages[self.base_name][1]
+
+    # Content hash of the loaded frame, computed on first use
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint(self.base)
+        return self._fingerprint
+
+    @property
+    def index(self):
+        return self._stages[self.base_name][1].index
+
+    # Register `name` as `parent` plus the columns of `delta` (new or replacing the parent's).
+    # `delta` must share the base frame's index.
+    def set_stage(self, name, parent, delta=None):
+        if parent not in self._stages:
+            raise KeyError(f"Unknown parent stage: {parent}")
+        if name == self.base_name:
+            raise ValueError("The base stage cannot be replaced")
+        if delta is None:
+            delta = pd.DataFrame(index=self.index)
+        elif not delta.index.equals(self.index):
+            raise ValueError(f"Stage {name} does not share the base frame's index")
+        self._stages[name] = (parent, delta)
+
+    # Store a named row selection as base-frame positions
+    def set_rows(self, name, positions):
+        self._rows[name] = np.asarray(positions, dtype=np.intp)
+
+    def rows(self, name):
+        return self._rows.get(name)
+
+    def has_rows(self, name):
+        return name in self._rows
+
+    def columns(self, stage):
+        parent, delta = self._stages[stage]
+        if parent is None:
+            return list(delta.columns)
+        columns = self.columns(parent)
+        return columns + [col for col in delta.columns if col not in columns]
+
+    # The stored Series for one column of a stage (no copy)
+    def column(self, stage, col):
+        while stage is not None:
+            parent, delta = self._stages[stage]
+            if col in delta.columns:
+                return delta[col]
+            stage = parent
+        raise KeyError(col)
+
+    # Materialize a stage as a new DataFrame, optionally restricted to some columns and to
+    # a named row selection (or an array of positions)
+    def frame(self, stage, columns=None, rows=None):
+        columns = self.columns(stage) if columns is None else list(columns)
+        df = pd.DataFrame({col: self.column(stage, col) for col in columns}, index=self.index)
+        if rows is not None:
+            df = df.iloc[self._rows[rows] if isinstance(rows, str) else rows]
+        return df
+
+    # Materialize one column, optionally restricted to a row selection
+    def series(self, stage, col, rows=None):
+        series = self.column(stage, col)
+        if rows is not None:
+            series = series.iloc[self._rows[rows] if isinstance(rows, str) else rows]
+        return series
+
+    # Memory actually held by each stage (base frame, column deltas and row selections)
+    def memory_report(self):
+        report = [{
+            'Frame': stage,
+            'Rows': len(delta),
+            'Columns': delta.shape[1],
+            'Memory (MB)': frame_memory_mb(delta),
+        } for stage, (_, delta) in self._stages.items()]
+        report += [{
+            'Frame': f"rows:{name}",
+            'Rows': len(positions),
+            'Columns': 0,
+            'Memory (MB)': positions.nbytes / 1024 ** 2,
+        } for name, positions in self._rows.items()]
+        return report
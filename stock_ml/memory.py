@@ -0,0 +1,49 @@
+# Dtype downcasting and memory accounting for pipeline DataFrames
+import pandas as pd
+
+
+# Helper function to get the deep memory footprint of a DataFrame or Series in megabytes
+def frame_memory_mb(df):
+    usage = df.memory_usage(deep=True)
+    return (usage.sum() if isinstance(df, pd.DataFrame) else usage) / 1024 ** 2
+
+
+# Downcast float columns to float32 and integer columns to the smallest integer type
+def downcast_numeric(df):
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if pd.api.types.is_bool_dtype(df[col]):
+            continue
+        if pd.api.types.is_float_dtype(df[col]):
+            df[col] = df[col].astype('float32')
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+
+# Shrink a frame for storage: floats to float32, integers to the smallest integer type and
+# text columns whose values repeat (unique ratio below `category_ratio`) to categoricals
+def compact_frame(df, category_ratio=0.5):
+    df = downcast_numeric(df)
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            if len(series) and series.nunique(dropna=True) / len(series) < category_ratio:
+                df[col] = series.astype('category')
+    return df
+
+
+# Memory breakdown of every DataFrame/Series (or frame lineage) stored in the pipeline state
+def pipeline_memory_report(pipeline):
+    rows = []
+    for name, value in pipeline.items():
+        if hasattr(value, 'memory_report'):
+            rows.extend(value.memory_report())
+        elif isinstance(value, (pd.DataFrame, pd.Series)):
+            rows.append({
+                'Frame': name,
+                'Rows': len(value),
+                'Columns': value.shape[1] if value.ndim == 2 else 1,
+                'Memory (MB)': frame_memory_mb(value),
+            })
+    return pd.DataFrame(rows, columns=['Frame', 'Rows', 'Columns', 'Memory (MB)'])
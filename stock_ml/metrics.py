@@ -0,0 +1,92 @@
+# Vectorized regression metrics for many models (and folds) at once.
+# Predictions are stacked into one (n_models, n_rows) error matrix; per-group sums of squared
+# and absolute errors come from a single bincount over (model, group) codes. Bootstrap
+# confidence intervals draw every resample as a row of counts, so the sums of all resamples are
+# one matrix product of the (n_resamples, n_rows) count matrix with the per-row statistics.
+import numpy as np
+import pandas as pd
+
+METRICS = ['RMSE', 'MAE', 'R²']
+BOOTSTRAP_RESAMPLES = 2000
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_CHUNK_CELLS = 5_000_000
+
+
+# Helper function to stack predictions ({name: array}) into an error matrix against y_true
+def _errors(y_true, predictions):
+    y_true = np.asarray(y_true, dtype=np.float64)
+    predicted = np.vstack([np.asarray(y_pred, dtype=np.float64) for y_pred in predictions.values()])
+    return y_true, predicted - y_true
+
+
+# R² from sums of squares, with scikit-learn's convention for a constant target
+def _r2(sse, sst):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(sst > 0, 1.0 - sse / sst, np.where(sse == 0, 1.0, 0.0))
+
+
+# RMSE, MAE and R² of every model, overall or per group (e.g. walk-forward fold ids in
+# `groups`). Returns one row per model (and group) with the metrics and the row count.
+def metrics_table(y_true, predictions, groups=None):
+    y_true, errors = _errors(y_true, predictions)
+    n_models, n_rows = errors.shape
+    if groups is None:
+        codes, labels = np.zeros(n_rows, dtype=np.intp), [None]
+    else:
+        codes, labels = pd.factorize(np.asarray(groups), sort=True)
+    n_groups = len(labels)
+
+    # Sums per (model, group) in one bincount each
+    flat = (np.arange(n_models)[:, None] * n_groups + codes).ravel()
+    sse = np.bincount(flat, weights=(errors ** 2).ravel(), minlength=n_models * n_groups).reshape(n_models, n_groups)
+    sae = np.bincount(flat, weights=np.abs(errors).ravel(), minlength=n_models * n_groups).reshape(n_models, n_groups)
+    count = np.bincount(codes, minlength=n_groups).astype(np.float64)
+    centered = y_true - y_true.mean() if n_rows else y_true
+    sum_y = np.bincount(codes, weights=centered, minlength=n_groups)
+    sst = np.bincount(codes, weights=centered ** 2, minlength=n_groups) - sum_y ** 2 / np.maximum(count, 1)
+
+    table = pd.DataFrame({
+        'Model': np.repeat(list(predictions), n_groups),
+        'Group': np.tile(labels, n_models),
+        'RMSE': np.sqrt(sse / count).ravel(),
+        'MAE': (sae / count).ravel(),
+        'R²': _r2(sse, sst).ravel(),
+        'Rows': np.tile(count.astype(np.int64), n_models),
+    })
+    return table.drop(columns='Group') if groups is None else table
+
+
+# Percentile bootstrap intervals of RMSE, MAE and R² for every model. All models are scored on
+# the same resamples. Returns one row per model with '<metric> Low' / '<metric> High' columns.
+def bootstrap_intervals(y_true, predictions, n_resamples=BOOTSTRAP_RESAMPLES, confidence=BOOTSTRAP_CONFIDENCE, random_state=0):
+    y_true, errors = _errors(y_true, predictions)
+    n_models, n_rows = errors.shape
+    centered = y_true - y_true.mean()
+    # Per-row statistics: squared and absolute errors of every model, then y and y² (centered)
+    statistics = np.column_stack([errors.T ** 2, np.abs(errors.T), centered, centered ** 2])
+
+    rng = np.random.default_rng(random_state)
+    sums = np.empty((n_resamples, statistics.shape[1]))
+    chunk = max(1, BOOTSTRAP_CHUNK_CELLS // max(n_rows, 1))
+    for start in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - start)
+        # Row i of `counts` says how often each observation was drawn in resample i
+        draws = rng.integers(0, n_rows, size=(size, n_rows)) + (np.arange(size) * n_rows)[:, None]
+        counts = np.bincount(draws.ravel(), minlength=size * n_rows).reshape(size, n_rows).astype(np.float64)
+        sums[start:start + size] = counts @ statistics
+
+    sse, sae = sums[:, :n_models], sums[:, n_models:2 * n_models]
+    sst = sums[:, -1] - sums[:, -2] ** 2 / n_rows
+    resampled = {
+        'RMSE': np.sqrt(sse / n_rows),
+        'MAE': sae / n_rows,
+        'R²': _r2(sse, sst[:, None]),
+    }
+
+    tail = 100 * (1 - confidence) / 2
+    table = pd.DataFrame({'Model': list(predictions)})
+    for metric, values in resampled.items():
+        low, high = np.percentile(values, [tail, 100 - tail], axis=0)
+        table[f'{metric} Low'] = low
+        table[f'{metric} High'] = high
+    return table
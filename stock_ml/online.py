@@ -0,0 +1,70 @@
+# Incremental least squares from sufficient statistics.
+# The model keeps the row count, the feature/target means and the centered cross-products
+# X'X and X'y. A new chunk of bars is summarized on its own and merged in (Chan et al.'s pairwise
+# update), so absorbing it costs time proportional to the chunk, never to the history. Solving
+# the centered normal equations with lstsq gives the same coefficients and intercept as a batch
+# LinearRegression fit on all rows seen so far, up to floating-point tolerance.
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+
+
+def _chunk_statistics(X, y):
+    mean_x = X.mean(axis=0)
+    mean_y = y.mean()
+    centered = X - mean_x
+    return len(X), mean_x, mean_y, centered.T @ centered, centered.T @ (y - mean_y)
+
+
+class OnlineLinearRegression(RegressorMixin, BaseEstimator):
+    def __init__(self):
+        pass
+
+    # Batch fit: forget what was seen before and absorb (X, y) as one chunk
+    def fit(self, X, y):
+        for attribute in ['n_samples_seen_', 'coef_', 'intercept_']:
+            self.__dict__.pop(attribute, None)
+        return self.partial_fit(X, y)
+
+    def partial_fit(self, X, y):
+        if hasattr(X, 'columns'):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if X.ndim == 1:
+            X = X[:, None]
+        if len(X) != len(y):
+            raise ValueError(f"X has {len(X)} rows but y has {len(y)}")
+        if not len(X):
+            return self
+
+        n, mean_x, mean_y, sxx, sxy = _chunk_statistics(X, y)
+        if not hasattr(self, 'n_samples_seen_'):
+            self.n_features_in_ = X.shape[1]
+            self.n_samples_seen_, self.mean_x_, self.mean_y_, self.sxx_, self.sxy_ = n, mean_x, mean_y, sxx, sxy
+        else:
+            if X.shape[1] != self.n_features_in_:
+                raise ValueError(f"X has {X.shape[1]} features, but the model was fitted with {self.n_features_in_}")
+            total = self.n_samples_seen_ + n
+            weight = self.n_samples_seen_ * n / total
+            delta_x = mean_x - self.mean_x_
+            delta_y = mean_y - self.mean_y_
+            self.sxx_ = self.sxx_ + sxx + weight * np.outer(delta_x, delta_x)
+            self.sxy_ = self.sxy_ + sxy + weight * delta_x * delta_y
+            self.mean_x_ = self.mean_x_ + delta_x * n / total
+            self.mean_y_ = self.mean_y_ + delta_y * n / total
+            self.n_samples_seen_ = total
+        self._solve()
+        return self
+
+    # Minimum-norm solution of the centered normal equations, like LinearRegression's lstsq.
+    # Features are rescaled to unit diagonal first so wide differences in scale (prices next to
+    # returns) do not cost precision; constant features get a zero coefficient.
+    def _solve(self):
+        scale = np.sqrt(np.diag(self.sxx_))
+        scale[scale == 0] = np.inf
+        coef = np.linalg.lstsq(self.sxx_ / np.outer(scale, scale), self.sxy_ / scale, rcond=None)[0]
+        self.coef_ = coef / scale
+        self.intercept_ = self.mean_y_ - self.mean_x_ @ self.coef_
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
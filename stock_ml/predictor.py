@@ -0,0 +1,117 @@
+# Low-latency single-row predictions for the interactive prediction widget.
+# Linear and logistic models are compiled to their coefficient vector (matrix for multiclass)
+# and intercept, so a prediction is one dot product on a plain float array: no DataFrame is
+# built and scikit-learn's input validation is skipped. Other models fall back to predict().
+# What-if grids and partial dependence are built as one feature matrix and predicted in a
+# single batched call (split only when the matrix would exceed MAX_BATCH_CELLS values);
+# classifiers are averaged as class probabilities.
+import numpy as np
+import pandas as pd
+
+MAX_BATCH_CELLS = 20_000_000
+PARTIAL_DEPENDENCE_ROWS = 200
+
+
+class CompiledPredictor:
+    def __init__(self, model, features):
+        self.model = model
+        self.features = list(features)
+        self.is_classifier = hasattr(model, 'classes_')
+        self.classes = getattr(model, 'classes_', None)
+        coef = getattr(model, 'coef_', None)
+        self.linear = coef is not None and hasattr(model, 'intercept_')
+        if self.linear:
+            self.coef = np.array(coef, dtype=np.float64)
+            self.intercept = np.array(model.intercept_, dtype=np.float64)
+
+    # Prediction for one row of feature values (in `features` order)
+    def predict_one(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if not self.linear:
+            return self.model.predict(pd.DataFrame([values], columns=self.features))[0]
+        if self.classes is None:
+            return float(self.coef @ values + self.intercept)
+        # Classifier: binary models have one decision row, multiclass one per class
+        decision = self.coef @ values + self.intercept
+        if decision.size == 1:
+            return self.classes[int(decision[0] > 0)]
+        return self.classes[int(decision.argmax())]
+
+    # Predictions for every row of a (n_rows, n_features) array. Classifiers return class codes
+    # (positions in classes_).
+    def predict_many(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if not self.linear:
+            predictions = self.model.predict(pd.DataFrame(X, columns=self.features))
+            classes = getattr(self.model, 'classes_', None)
+            return np.searchsorted(classes, predictions) if classes is not None else predictions
+        if self.classes is None:
+            return X @ self.coef + self.intercept
+        decision = X @ self.coef.T + self.intercept
+        if decision.shape[1] == 1:
+            return (decision[:, 0] > 0).astype(np.intp)
+        return decision.argmax(axis=1)
+
+    # Class probabilities (n_rows, n_classes) of a classifier for every row. Logistic models use
+    # the sigmoid (binary) or softmax (multinomial) of the compiled decision function.
+    def predict_proba_many(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if not self.linear:
+            return self.model.predict_proba(pd.DataFrame(X, columns=self.features))
+        decision = X @ self.coef.T + self.intercept
+        if decision.shape[1] == 1:
+            positive = 1.0 / (1.0 + np.exp(-decision[:, 0]))
+            return np.column_stack((1.0 - positive, positive))
+        decision -= decision.max(axis=1, keepdims=True)
+        np.exp(decision, out=decision)
+        return decision / decision.sum(axis=1, keepdims=True)
+
+
+# Min, max and mean of every feature in one pass over the values, as float arrays
+def feature_bounds(df, features):
+    values = df[list(features)].to_numpy(dtype=np.float64)
+    return {
+        'features': list(features),
+        'min': np.nanmin(values, axis=0),
+        'max': np.nanmax(values, axis=0),
+        'mean': np.nanmean(values, axis=0),
+    }
+
+
+# Random sample of data rows (as a float array) that partial dependence averages over
+def sample_rows(df, features, n_rows=PARTIAL_DEPENDENCE_ROWS, random_state=0):
+    values = df[list(features)].dropna()
+    if len(values) > n_rows:
+        values = values.sample(n_rows, random_state=random_state)
+    return values.to_numpy(dtype=np.float64)
+
+
+# Evenly spaced values of one feature between its minimum and maximum
+def feature_grid(bounds, feature, n_points):
+    i = bounds['features'].index(feature)
+    return np.linspace(bounds['min'][i], bounds['max'][i], int(n_points))
+
+
+# Predictions over a grid of one or two features. `grids` maps feature -> grid values; every
+# other feature is held at its value in `rows` (one row for a what-if at the current inputs,
+# a sample of data rows for partial dependence, which averages over them). Returns an array of
+# shape (len(grid 1),) or (len(grid 1), len(grid 2)); classifiers get a trailing axis with the
+# average probability of every class.
+def grid_predictions(predictor, rows, grids):
+    rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+    columns = [predictor.features.index(feature) for feature in grids]
+    mesh = np.meshgrid(*grids.values(), indexing='ij')
+    shape = mesh[0].shape
+    points = np.column_stack([axis.ravel() for axis in mesh])
+    predict = predictor.predict_proba_many if predictor.is_classifier else predictor.predict_many
+    n_outputs = len(predictor.classes) if predictor.is_classifier else 1
+
+    # Every grid point is repeated once per row: X holds the rows, grid point after grid point
+    chunk = max(1, MAX_BATCH_CELLS // (len(rows) * rows.shape[1]))
+    averages = np.empty((len(points), n_outputs))
+    for start in range(0, len(points), chunk):
+        block = points[start:start + chunk]
+        X = np.tile(rows, (len(block), 1))
+        X[:, columns] = np.repeat(block, len(rows), axis=0)
+        averages[start:start + len(block)] = predict(X).reshape(len(block), len(rows), n_outputs).mean(axis=1)
+    return averages.reshape(shape + (n_outputs,)) if predictor.is_classifier else averages.reshape(shape)
@@ -0,0 +1,76 @@
+# Concurrent, TTL-cached quote fetcher shared by the welcome ticker and the current price lookup
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yfinance as yf
+
+QUOTE_TTL_SECONDS = float(os.environ.get('STOCK_ML_QUOTE_TTL', 60))
+
+
+# Helper function to read the latest price of one symbol from Yahoo Finance
+def fetch_yfinance_quote(symbol):
+    info = yf.Ticker(symbol).info
+    return info.get('regularMarketPrice', info.get('currentPrice'))
+
+
+class QuoteService:
+    # Quotes are cached per symbol for `ttl` seconds; stale or missing symbols of a batch
+    # are fetched concurrently on a bounded thread pool.
+    def __init__(self, fetch_quote=fetch_yfinance_quote, ttl=QUOTE_TTL_SECONDS, max_workers=8):
+        self.fetch_quote = fetch_quote
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, symbol):
+        with self._lock:
+            entry = self._cache.get(symbol)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry
+        return None
+
+    def _store(self, symbol, price):
+        with self._lock:
+            self._cache[symbol] = (time.monotonic(), price)
+
+    # Price for one symbol; provider errors are raised to the caller
+    def get_quote(self, symbol):
+        symbol = symbol.upper()
+        entry = self._cached(symbol)
+        if entry is not None:
+            return entry[1]
+        price = self.fetch_quote(symbol)
+        self._store(symbol, price)
+        return price
+
+    # Prices for a batch of symbols; a symbol that fails to fetch maps to None
+    def get_quotes(self, symbols):
+        symbols = [s.upper() for s in symbols]
+        quotes = {}
+        stale = []
+        for symbol in symbols:
+            entry = self._cached(symbol)
+            if entry is not None:
+                quotes[symbol] = entry[1]
+            else:
+                stale.append(symbol)
+
+        if stale:
+            def fetch(symbol):
+                try:
+                    return self.get_quote(symbol)
+                except Exception:
+                    return None
+
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(stale))) as pool:
+                for symbol, price in zip(stale, pool.map(fetch, stale)):
+                    quotes[symbol] = price
+
+        return {symbol: quotes[symbol] for symbol in symbols}
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
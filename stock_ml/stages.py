@@ -0,0 +1,66 @@
+# Content-hash memoization for the pipeline stages.
+# The loaded data is fingerprinted once; every later stage is keyed by the keys of the stages it
+# reads from plus its own parameters, so a stage only recomputes when something upstream changed.
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# Helper function to hash DataFrames, Series, arrays and plain parameters into a short key
+def fingerprint(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(part, index=True).values.tobytes())
+            columns = list(part.columns) if isinstance(part, pd.DataFrame) else [part.name]
+            digest.update(repr((columns, [str(t) for t in np.atleast_1d(part.dtypes)])).encode())
+        elif isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+            digest.update(repr((part.dtype.str, part.shape)).encode())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b'|')
+    return digest.hexdigest()[:16]
+
+
+class StageCache:
+    # Keeps the `max_entries` most recently used outputs of every stage
+    def __init__(self, max_entries=3):
+        self.max_entries = max_entries
+        self._entries = {}
+        self.stats = {}
+
+    def key(self, stage, inputs=(), params=None):
+        return fingerprint(stage, tuple(inputs), sorted(params.items()) if params else None)
+
+    # Look up a stored output without computing it; returns (found, output)
+    def lookup(self, stage, key):
+        entries = self._entries.get(stage)
+        if entries is None or key not in entries:
+            return False, None
+        entries.move_to_end(key)
+        self.stats.setdefault(stage, {'hits': 0, 'misses': 0})['hits'] += 1
+        return True, entries[key]
+
+    # Store an output computed outside of run(), e.g. several stage outputs computed concurrently
+    def store(self, stage, key, value):
+        entries = self._entries.setdefault(stage, OrderedDict())
+        self.stats.setdefault(stage, {'hits': 0, 'misses': 0})['misses'] += 1
+        entries[key] = value
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    # Return (key, output) for a stage, calling compute() only on a cache miss
+    def run(self, stage, inputs, params, compute):
+        key = self.key(stage, inputs, params)
+        found, value = self.lookup(stage, key)
+        if not found:
+            value = compute()
+            self.store(stage, key, value)
+        return key, value
+
+    def clear(self):
+        self._entries.clear()
+        self.stats.clear()
@@ -0,0 +1,59 @@
+# Theme background pipeline: downsize and recompress each background once, under a
+# content-hashed file name the browser can cache
+import base64
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image
+
+BACKGROUND_MAX_SIZE = (1920, 1080)
+BACKGROUND_JPEG_QUALITY = 80
+BACKGROUND_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+
+
+# Helper function to get a short, stable hash of a source image and its processing settings
+def _asset_hash(source_path, max_size, quality):
+    digest = hashlib.sha256(Path(source_path).read_bytes())
+    digest.update(f"{max_size}-{quality}".encode())
+    return digest.hexdigest()[:12]
+
+
+# Downsize one background to fit `max_size` and re-encode it as progressive JPEG.
+# The output is named <stem>-<hash>.jpg and is only written when it does not exist yet.
+def prepare_background(source_path, output_dir, max_size=BACKGROUND_MAX_SIZE, quality=BACKGROUND_JPEG_QUALITY):
+    source_path = Path(source_path)
+    output_dir = Path(output_dir)
+    stem = source_path.stem.replace(' ', '_').replace('(', '').replace(')', '')
+    output_path = output_dir / f"{stem}-{_asset_hash(source_path, max_size, quality)}.jpg"
+    if output_path.exists():
+        return output_path
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with Image.open(source_path) as image:
+        image = image.convert('RGB')
+        image.thumbnail(max_size, Image.LANCZOS)
+        tmp_path = output_path.with_suffix('.tmp')
+        image.save(tmp_path, format='JPEG', quality=quality, optimize=True, progressive=True)
+    tmp_path.replace(output_path)
+
+    # Drop outdated renditions of the same background
+    for stale in output_dir.glob(f"{stem}-*.jpg"):
+        if stale != output_path:
+            stale.unlink(missing_ok=True)
+    return output_path
+
+
+# Prepare every background in `source_dir`; returns {source file name: processed path}
+def prepare_backgrounds(source_dir, output_dir, max_size=BACKGROUND_MAX_SIZE, quality=BACKGROUND_JPEG_QUALITY):
+    return {
+        path.name: prepare_background(path, output_dir, max_size, quality)
+        for path in sorted(Path(source_dir).iterdir())
+        if path.suffix.lower() in BACKGROUND_EXTENSIONS
+    }
+
+
+# Base64 data URI of a processed background, encoded once per process
+@lru_cache(maxsize=None)
+def background_data_uri(path):
+    return "data:image/jpeg;base64," + base64.b64encode(Path(path).read_bytes()).decode()
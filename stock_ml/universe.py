@@ -0,0 +1,65 @@
+# Multi-symbol universe loader producing a (Symbol, Date) panel DataFrame
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+
+# Helper function to split a free-text watchlist ("AAPL, msft tsla\nGOOGL") into unique symbols
+def parse_watchlist(text):
+    symbols = []
+    for token in re.split(r'[\s,;]+', text.upper()):
+        if token and token not in symbols:
+            symbols.append(token)
+    return symbols
+
+
+# Helper function to shrink a single-symbol OHLCV frame to compact dtypes
+def compact_ohlcv(df):
+    df = df.copy()
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('float32')
+    if 'Volume' in df.columns:
+        df['Volume'] = pd.to_numeric(df['Volume'], downcast='integer')
+    return df
+
+
+# Download every symbol of the watchlist in parallel through fetch(symbol, start, end).
+# Returns (panel, report): panel is indexed by (Symbol, Date), report has one row per symbol
+# with its row count, fetch latency and error message (None when it succeeded).
+def load_universe(symbols, start, end, fetch, max_workers=8):
+    def fetch_one(symbol):
+        started = time.perf_counter()
+        try:
+            df = fetch(symbol, start, end)
+            error = None if df is not None and not df.empty else 'No data in range'
+        except Exception as e:
+            df, error = None, str(e)
+        return symbol, df, time.perf_counter() - started, error
+
+    frames = {}
+    report = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as pool:
+        for symbol, df, seconds, error in pool.map(fetch_one, symbols):
+            if error is None:
+                frames[symbol] = compact_ohlcv(df).set_index('Date')
+            report.append({
+                'Symbol': symbol,
+                'Rows': 0 if error else len(frames[symbol]),
+                'Seconds': seconds,
+                'Error': error,
+            })
+
+    report = pd.DataFrame(report, columns=['Symbol', 'Rows', 'Seconds', 'Error'])
+    if not frames:
+        return None, report
+
+    panel = pd.concat(frames, names=['Symbol', 'Date']).sort_index()
+    panel.index = panel.index.set_levels(
+        panel.index.levels[0].astype('category'), level='Symbol'
+    )
+    return panel, report
@@ -0,0 +1,120 @@
+# Walk-forward (time-ordered) cross-validation.
+# Folds always train on the past and test on the block right after it, either with an expanding
+# training window or a rolling one of fixed size. Folds are fitted in parallel with joblib; X and
+# y are passed once as plain arrays, which joblib memory-maps read-only for the worker processes
+# instead of pickling a copy per fold. Incremental models (partial_fit) on expanding folds run
+# sequentially instead, absorbing only the rows each fold adds.
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import TimeSeriesSplit
+
+from stock_ml.metrics import metrics_table
+
+WALK_FORWARD_MODES = ["Expanding window", "Rolling window"]
+
+
+# Helper function to get row positions in time order (stable, so panel rows of the same date
+# keep their order); rows are assumed to already be in time order when there are no dates
+def chronological_order(n_rows, dates=None):
+    if dates is None:
+        return np.arange(n_rows)
+    return np.argsort(pd.to_datetime(dates).to_numpy(), kind='stable')
+
+
+# Chronological folds as a list of (train row positions, test row positions).
+# `train_size` caps the training window in rolling mode; `gap` rows between the training and
+# the test block are left out so features that look back (moving averages, lags) cannot leak.
+def walk_forward_folds(n_rows, n_folds=5, mode="Expanding window", train_size=None, test_size=None, gap=0, dates=None):
+    splitter = TimeSeriesSplit(
+        n_splits=n_folds,
+        max_train_size=train_size if mode == "Rolling window" else None,
+        test_size=test_size,
+        gap=gap,
+    )
+    order = chronological_order(n_rows, dates)
+    return [(order[train], order[test]) for train, test in splitter.split(np.empty((n_rows, 0)))]
+
+
+def _fit_fold(model, X, y, train_rows, test_rows):
+    model = clone(model)
+    started = time.perf_counter()
+    model.fit(X[train_rows], y[train_rows])
+    fit_seconds = time.perf_counter() - started
+    y_pred = model.predict(X[test_rows])
+    return y_pred, fit_seconds
+
+
+# Helper function to check that every fold's training rows extend the previous fold's
+# (an expanding window), so a model can absorb just the new rows fold after fold
+def _is_expanding(folds):
+    previous = np.empty(0, dtype=np.intp)
+    for train_rows, _ in folds:
+        if len(train_rows) < len(previous) or not np.array_equal(train_rows[:len(previous)], previous):
+            return False
+        previous = train_rows
+    return True
+
+
+# Expanding-window folds for an incremental model (one with partial_fit): each fold only
+# adds the rows that are new since the previous fold, in order, instead of refitting
+def _incremental_folds(model, X, y, folds):
+    model = clone(model)
+    outputs = []
+    seen = 0
+    for train_rows, test_rows in folds:
+        started = time.perf_counter()
+        model.partial_fit(X[train_rows[seen:]], y[train_rows[seen:]])
+        fit_seconds = time.perf_counter() - started
+        seen = len(train_rows)
+        outputs.append((model.predict(X[test_rows]), fit_seconds))
+    return outputs
+
+
+# Fit and score `model` on every fold. Returns (per-fold DataFrame, summary dict) where the
+# summary has the mean and standard deviation of the fold scores and the RMSE/R² of all
+# out-of-sample predictions pooled together.
+def walk_forward_cv(model, X, y, folds, dates=None, n_jobs=-1):
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    if hasattr(model, 'partial_fit') and _is_expanding(folds):
+        outputs = _incremental_folds(model, X, y, folds)
+    else:
+        outputs = Parallel(n_jobs=n_jobs, max_nbytes='1M', mmap_mode='r')(
+            delayed(_fit_fold)(model, X, y, train_rows, test_rows) for train_rows, test_rows in folds
+        )
+
+    # Scores of every fold and of all folds pooled, from one vectorized pass each
+    all_test = np.concatenate([test_rows for _, test_rows in folds])
+    all_pred = {'model': np.concatenate([y_pred for y_pred, _ in outputs])}
+    fold_ids = np.repeat(np.arange(1, len(folds) + 1), [len(test_rows) for _, test_rows in folds])
+    fold_scores = metrics_table(y[all_test], all_pred, groups=fold_ids).set_index('Group')
+    pooled = metrics_table(y[all_test], all_pred).iloc[0]
+
+    dates = pd.to_datetime(dates).to_numpy() if dates is not None else None
+    rows = []
+    for fold, ((train_rows, test_rows), (y_pred, fit_seconds)) in enumerate(zip(folds, outputs), start=1):
+        row = {'Fold': fold, 'Train Rows': len(train_rows), 'Test Rows': len(test_rows)}
+        if dates is not None:
+            row.update({
+                'Train Start': dates[train_rows].min(), 'Train End': dates[train_rows].max(),
+                'Test Start': dates[test_rows].min(), 'Test End': dates[test_rows].max(),
+            })
+        row.update({'RMSE': fold_scores.at[fold, 'RMSE'], 'R²': fold_scores.at[fold, 'R²']})
+        row['Fit (s)'] = fit_seconds
+        rows.append(row)
+    per_fold = pd.DataFrame(rows)
+
+    summary = {
+        'Folds': len(folds),
+        'Mean RMSE': per_fold['RMSE'].mean(),
+        'Std RMSE': per_fold['RMSE'].std(),
+        'Mean R²': per_fold['R²'].mean(),
+        'Std R²': per_fold['R²'].std(),
+        'Pooled RMSE': pooled['RMSE'],
+        'Pooled R²': pooled['R²'],
+    }
+    return per_fold, summary
@@ -0,0 +1,64 @@
+import pandas as pd
+
+from stock_ml.data_store import OHLCVStore
+
+HOLIDAYS = pd.to_datetime(['2024-12-25'])
+
+
+# Fake provider: one bar per business day in [start, end), recording every request
+class FakeProvider:
+    def __init__(self, empty=False):
+        self.calls = []
+        self.empty = empty
+
+    def __call__(self, symbol, start, end):
+        self.calls.append((start, end))
+        if self.empty:
+            return None
+        dates = pd.bdate_range(start, end, inclusive='left').difference(HOLIDAYS).tz_localize('America/New_York')
+        return pd.DataFrame({'Date': dates, 'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1})
+
+
+def test_range_ending_on_weekend_is_not_refetched(tmp_path):
+    store = OHLCVStore(tmp_path)
+    fetch = FakeProvider()
+    # 2024-03-02 is a Saturday: the last bar is Friday 2024-03-01
+    first = store.load('XYZ', '2024-02-01', '2024-03-03', fetch)
+    second = store.load('XYZ', '2024-02-01', '2024-03-03', fetch)
+
+    assert fetch.calls == [('2024-02-01', '2024-03-03')]
+    assert store.missing_ranges('XYZ', '2024-02-01', '2024-03-03') == []
+    assert len(first) == len(second) == 22
+
+
+def test_range_ending_on_holiday_is_not_refetched(tmp_path):
+    store = OHLCVStore(tmp_path)
+    fetch = FakeProvider()
+    # The range ends on the 2024-12-25 holiday, which has no bar
+    store.load('XYZ', '2024-12-01', '2024-12-26', fetch)
+    bars = store.load('XYZ', '2024-12-01', '2024-12-26', fetch)
+    assert len(fetch.calls) == 1
+    assert str(bars['Date'].max().date()) == '2024-12-24'
+
+
+def test_empty_response_does_not_mark_range_covered(tmp_path):
+    store = OHLCVStore(tmp_path)
+    assert store.load('XYZ', '2024-01-01', '2024-02-01', FakeProvider(empty=True)).empty
+    assert store.coverage('XYZ') == []
+
+    fetch = FakeProvider()
+    assert len(store.load('XYZ', '2024-01-01', '2024-02-01', fetch)) == 23
+    assert fetch.calls == [('2024-01-01', '2024-02-01')]
+
+
+def test_stored_only_load_does_not_rewrite_files(tmp_path):
+    store = OHLCVStore(tmp_path)
+    end = (pd.Timestamp.today() + pd.Timedelta(days=2)).strftime('%Y-%m-%d')
+    first = store.load('XYZ', '2024-01-01', end, FakeProvider())
+    written = {p.name: p.stat().st_mtime_ns for p in tmp_path.iterdir()}
+
+    # The range through today stays uncovered, but a fetch returning None must not write anything
+    second = store.load('XYZ', '2024-01-01', end, FakeProvider(empty=True))
+    assert {p.name: p.stat().st_mtime_ns for p in tmp_path.iterdir()} == written
+    assert not any(p.name.endswith('.tmp') for p in tmp_path.iterdir())
+    assert len(first) == len(second)
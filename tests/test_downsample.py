@@ -0,0 +1,29 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from stock_ml.downsample import downsample_series
+
+
+def test_tz_aware_dates_downsample_without_warnings():
+    dates = pd.Series(pd.date_range('2024-01-01', periods=10_000, freq='h', tz='America/New_York'))
+    close = np.sin(np.arange(len(dates)) / 50.0)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        rows, n_visible = downsample_series(dates, close, budget=500)
+        zoomed, n_zoomed = downsample_series(dates, close, budget=500, window=('2024-01-05', '2024-01-06'))
+
+    assert n_visible == len(dates) and len(rows) <= 500
+    assert rows[0] == 0 and rows[-1] == len(dates) - 1
+    # The zoom window is read in the dates' own wall-clock time
+    assert n_zoomed == 25
+    assert dates.iloc[zoomed].min() == pd.Timestamp('2024-01-05', tz='America/New_York')
+
+
+def test_tz_aware_and_naive_dates_pick_the_same_rows():
+    dates = pd.Series(pd.date_range('2024-01-01', periods=5_000, freq='D', tz='UTC'))
+    close = np.random.default_rng(0).normal(size=len(dates)).cumsum()
+    aware, _ = downsample_series(dates, close, budget=300)
+    naive, _ = downsample_series(dates.dt.tz_localize(None), close, budget=300)
+    np.testing.assert_array_equal(aware, naive)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from stock_ml.data_store import OHLCVStore
+from stock_ml.engine import stored_indicators
+from stock_ml.incremental import IndicatorStore
+from stock_ml.indicators import compute_indicators
+
+INDICATORS = {'SMA': [5, 50], 'EMA': [10], 'RSI': [14], 'Bollinger': [20], 'Volatility': [10], 'OBV': []}
+
+
+# Fake provider with a random walk around 50 before 2022 and around 200 after, one bar per
+# business day in [start, end)
+def fake_provider(symbol, start, end):
+    dates = pd.bdate_range(start, end, inclusive='left')
+    rng = np.random.default_rng(dates[0].toordinal())
+    level = np.where(dates.year < 2022, 50.0, 200.0)
+    close = level + rng.normal(size=len(dates)).cumsum()
+    return pd.DataFrame({'Date': dates.tz_localize('America/New_York'), 'Open': close, 'High': close + 1,
+                         'Low': close - 1, 'Close': close, 'Volume': rng.integers(1, 100, len(dates))})
+
+
+def _assert_matches_fresh(store, indicator_store, start, end):
+    bars = store.load('XYZ', start, end, fake_provider)
+    values = stored_indicators('XYZ', bars['Date'], INDICATORS, store, indicator_store)
+    expected = compute_indicators(bars, INDICATORS)
+    assert values is not None
+    np.testing.assert_allclose(values[expected.columns].to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+def test_disjoint_ranges_do_not_share_warm_up(tmp_path):
+    store, indicator_store = OHLCVStore(tmp_path), IndicatorStore(tmp_path)
+    _assert_matches_fresh(store, indicator_store, '2024-01-01', '2024-02-01')
+    # A second, unrelated range in the same store must not change the first one's features
+    _assert_matches_fresh(store, indicator_store, '2020-01-01', '2020-06-01')
+    _assert_matches_fresh(store, indicator_store, '2024-01-01', '2024-02-01')
+
+
+def test_extended_range_only_processes_new_bars(tmp_path):
+    store, indicator_store = OHLCVStore(tmp_path), IndicatorStore(tmp_path)
+    _assert_matches_fresh(store, indicator_store, '2023-01-01', '2023-06-01')
+    _assert_matches_fresh(store, indicator_store, '2023-01-01', '2023-09-01')
+    states = list(tmp_path.glob('XYZ.indicators.*.json'))
+    assert len(states) == 1
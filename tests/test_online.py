@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from stock_ml.artifacts import ModelArtifactStore
+from stock_ml.engine import run_pipeline, update_online_model
+from stock_ml.online import OnlineLinearRegression
+
+
+def _bars(n):
+    rng = np.random.default_rng(0)
+    close = 100 + rng.normal(size=300).cumsum()
+    dates = pd.bdate_range('2024-01-01', periods=300).tz_localize('America/New_York')
+    return pd.DataFrame({'Date': dates, 'Open': close + rng.normal(size=300), 'High': close + rng.uniform(0, 2, 300),
+                         'Low': close - 1, 'Close': close, 'Volume': rng.integers(1, 100, 300)}).iloc[:n]
+
+
+def test_update_absorbs_only_new_rows(tmp_path):
+    store = ModelArtifactStore(tmp_path)
+    bars = _bars(300)
+    X, y = bars[['Open', 'High']], bars['Close']
+
+    model, new_rows = update_online_model(store, 'key', X[:200], y[:200], bars['Date'][:200])
+    assert new_rows == 200
+    model, new_rows = update_online_model(store, 'key', X, y, bars['Date'])
+    assert new_rows == 100
+    assert model.n_samples_seen_ == 300
+    assert store.metadata('key')['trained_through'] == bars['Date'].iloc[-1].tz_localize(None).isoformat()
+
+    expected = LinearRegression().fit(X, y)
+    np.testing.assert_allclose(model.coef_, expected.coef_, rtol=1e-8)
+    np.testing.assert_allclose(model.intercept_, expected.intercept_, rtol=1e-8)
+    assert update_online_model(store, 'key', X, y, bars['Date'])[1] == 0
+
+
+def test_run_pipeline_updates_stored_online_model(tmp_path):
+    config = {'symbol': 'XYZ', 'target': 'Close', 'features': ['Open', 'High'], 'scale': False,
+              'walk_forward': {'folds': 3}, 'artifact_dir': str(tmp_path),
+              'models': [{'type': "Linear Regression", 'online': True, 'update': True}]}
+    run_pipeline(config, df=_bars(200))
+    metrics, _ = run_pipeline(config, df=_bars(300))
+    assert metrics['Error'].isna().all()
+
+    (artifact,) = ModelArtifactStore(tmp_path).list()
+    model = ModelArtifactStore(tmp_path).load(artifact['key'])['model']
+    assert isinstance(model, OnlineLinearRegression)
+    assert model.n_samples_seen_ == artifact['rows_seen'] == metrics.at[0, 'Train Rows']
+
+
+def test_update_requires_unscaled_features(tmp_path):
+    config = {'symbol': 'XYZ', 'features': ['Open', 'High'], 'artifact_dir': str(tmp_path),
+              'models': [{'type': "Linear Regression", 'online': True, 'update': True}]}
+    metrics, _ = run_pipeline(config, df=_bars(200))
+    assert 'scale' in metrics.at[0, 'Error']